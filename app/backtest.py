@@ -0,0 +1,275 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from instruments import normalize_pair
+
+
+# Record layout of the OHLC bar files, one <PAIR>.npy file per pair sorted by time
+OHLC_DTYPE = np.dtype([
+    ('time', 'M8[ns]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8')
+])
+
+# Upper bound on the number of (trade, variant, bar) checks held in memory per window
+MAX_WINDOW_ELEMENTS = 8_000_000
+
+# Variant applied when none are given: the trades exactly as journaled
+DEFAULT_VARIANTS = [{"name": "Recorded", "stop_mult": 1.0, "target_mult": 1.0}]
+
+
+def convert_ohlc_csv(csv_path, output_path):
+    """
+    Convert an OHLC CSV file (time, open, high, low, close) to a bar file.
+
+    Parameters:
+    -----------
+    csv_path : str
+        Path to the CSV file
+    output_path : str
+        Path of the .npy bar file to write
+
+    Returns:
+    --------
+    int
+        Number of bars written
+    """
+    df = pd.read_csv(csv_path)
+    df.columns = [col.strip().lower() for col in df.columns]
+    df['time'] = pd.to_datetime(df['time'])
+    df = df.sort_values('time')
+
+    bars = np.empty(len(df), dtype=OHLC_DTYPE)
+    for field in OHLC_DTYPE.names:
+        bars[field] = df[field].to_numpy()
+
+    np.save(output_path, bars)
+    return len(bars)
+
+
+def load_ohlc(ohlc_dir, pair):
+    """
+    Memory-map the bar file of a pair.
+
+    Parameters:
+    -----------
+    ohlc_dir : str
+        Directory containing the <PAIR>.npy bar files
+    pair : str
+        Pair name in any format accepted by `normalize_pair`
+
+    Returns:
+    --------
+    np.ndarray or None
+        Read-only memory-mapped bars, None if the pair has no bar file
+    """
+    path = os.path.join(ohlc_dir, f"{normalize_pair(pair)}.npy")
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
+
+
+def _first_touch(bars, start, stop_loss, take_profit, direction, window):
+    """
+    Find the first bar at which each trade and variant touches its stop or target.
+
+    Bars are scanned in growing windows that are gathered for all pending
+    trades at once, so no Python loop runs per bar.
+
+    Parameters:
+    -----------
+    bars : np.ndarray
+        OHLC bars of one pair
+    start : np.ndarray
+        Index of the entry bar of each trade, shape (trades,)
+    stop_loss : np.ndarray
+        Stop loss levels, shape (trades, variants)
+    take_profit : np.ndarray
+        Take profit levels (inf for no target), shape (trades, variants)
+    direction : np.ndarray
+        1 for long and -1 for short trades, shape (trades,)
+    window : int
+        Number of bars in the first window
+
+    Returns:
+    --------
+    tuple
+        Exit bar index (-1 while still open) and whether the exit was at the
+        stop loss, both shaped (trades, variants)
+    """
+    n_bars = len(bars)
+    n_trades, n_variants = stop_loss.shape
+    exit_bar = np.full((n_trades, n_variants), -1, dtype=np.int64)
+    stopped = np.zeros((n_trades, n_variants), dtype=bool)
+
+    # Flip short trades so every trade can be checked as a long
+    sl = direction[:, None] * stop_loss
+    tp = direction[:, None] * take_profit
+
+    offset = 0
+    pending = np.flatnonzero(start < n_bars)
+    while len(pending) and offset < n_bars:
+        idx = start[pending, None] + offset + np.arange(window)
+        valid = idx < n_bars
+        idx = np.minimum(idx, n_bars - 1)
+
+        high = np.asarray(bars['high'][idx])
+        low = np.asarray(bars['low'][idx])
+        d = direction[pending, None]
+        adverse = np.where(d > 0, low, -high)[:, None, :]
+        favorable = np.where(d > 0, high, -low)[:, None, :]
+
+        sl_hit = (adverse <= sl[pending, :, None]) & valid[:, None, :]
+        tp_hit = (favorable >= tp[pending, :, None]) & valid[:, None, :]
+
+        first_sl = np.where(sl_hit.any(axis=2), sl_hit.argmax(axis=2), window)
+        first_tp = np.where(tp_hit.any(axis=2), tp_hit.argmax(axis=2), window)
+        first = np.minimum(first_sl, first_tp)
+
+        # Only fill variants that were still open before this window
+        resolved = (first < window) & (exit_bar[pending] == -1)
+        rows, cols = np.nonzero(resolved)
+        exit_bar[pending[rows], cols] = start[pending[rows]] + offset + first[rows, cols]
+        # The stop is assumed to fill first when a bar touches both levels
+        stopped[pending[rows], cols] = first_sl[rows, cols] <= first_tp[rows, cols]
+
+        offset += window
+        pending = pending[(exit_bar[pending] == -1).any(axis=1) & (start[pending] + offset < n_bars)]
+        window = max(1, min(window * 2, MAX_WINDOW_ELEMENTS // max(1, len(pending) * n_variants)))
+
+    return exit_bar, stopped
+
+
+def backtest_trades(trades_df, ohlc_dir, variants=None, window=256):
+    """
+    Replay journaled setups against OHLC history with alternative stops and targets.
+
+    Every variant scales the stop and target distance from entry and all
+    variants of all trades of a pair are evaluated in one batched pass.
+    R multiples are expressed in units of the recorded stop distance, so a
+    loss with the stop widened by 1.5 counts as -1.5R.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+    ohlc_dir : str
+        Directory containing the <PAIR>.npy bar files (see `convert_ohlc_csv`)
+    variants : list, optional
+        Dicts with name, stop_mult and target_mult; defaults to the recorded levels
+    window : int
+        Number of bars scanned per trade in the first pass
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per trade and variant with the simulated outcome, R multiple
+        and exit time next to the recorded status and result
+    """
+    variants = variants or DEFAULT_VARIANTS
+    stop_mult = np.array([v['stop_mult'] for v in variants], dtype=float)
+    target_mult = np.array([v['target_mult'] for v in variants], dtype=float)
+
+    trades = trades_df.copy()
+    trades['date'] = pd.to_datetime(trades['date'], format="mixed", errors="coerce")
+    for col in ['entry_price', 'stop_loss', 'take_profit']:
+        trades[col] = pd.to_numeric(trades[col], errors='coerce')
+    trades = trades[trades['date'].notna() & trades['entry_price'].notna() & trades['stop_loss'].notna()
+                    & (trades['entry_price'] != trades['stop_loss'])]
+
+    results = []
+    for pair, group in trades.groupby(trades['pair'].map(normalize_pair)):
+        bars = load_ohlc(ohlc_dir, pair)
+        if bars is None or len(bars) == 0:
+            continue
+
+        entry = group['entry_price'].to_numpy(dtype=float)
+        risk = np.abs(entry - group['stop_loss'].to_numpy(dtype=float))
+        direction = np.where(group['stop_loss'].to_numpy(dtype=float) < entry, 1.0, -1.0)
+        reward = np.abs(group['take_profit'].fillna(0).to_numpy(dtype=float) - entry)
+        has_target = group['take_profit'].fillna(0).to_numpy(dtype=float) > 0
+
+        # Levels for every trade and variant, shape (trades, variants)
+        stop_loss = entry[:, None] - direction[:, None] * risk[:, None] * stop_mult
+        take_profit = np.where(
+            has_target[:, None],
+            entry[:, None] + direction[:, None] * reward[:, None] * target_mult,
+            direction[:, None] * np.inf
+        )
+
+        times = np.asarray(bars['time'])
+        start = np.searchsorted(times, group['date'].to_numpy(dtype='M8[ns]'), side='left')
+        exit_bar, stopped = _first_touch(bars, start, stop_loss, take_profit, direction, window)
+
+        closed = exit_bar >= 0
+        r_multiple = np.where(stopped, -stop_mult, reward[:, None] * target_mult / risk[:, None])
+        r_multiple = np.where(closed, r_multiple, np.nan)
+        outcome = np.where(closed, np.where(stopped, 'Loss', 'Win'), 'Open')
+        exit_time = np.where(closed, times[np.maximum(exit_bar, 0)], np.datetime64('NaT'))
+
+        n_trades, n_variants = exit_bar.shape
+        results.append(pd.DataFrame({
+            'trade_id': np.repeat(group['trade_id'].to_numpy(), n_variants),
+            'pair': np.repeat(group['pair'].to_numpy(), n_variants),
+            'date': np.repeat(group['date'].to_numpy(), n_variants),
+            'variant': np.tile([v['name'] for v in variants], n_trades),
+            'outcome': outcome.ravel(),
+            'r_multiple': r_multiple.ravel(),
+            'exit_time': exit_time.ravel(),
+            'recorded_status': np.repeat(group['status'].to_numpy(), n_variants),
+            'recorded_result': np.repeat(group['result'].to_numpy(), n_variants)
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=[
+            'trade_id', 'pair', 'date', 'variant', 'outcome', 'r_multiple',
+            'exit_time', 'recorded_status', 'recorded_result'
+        ])
+
+    results = pd.concat(results, ignore_index=True)
+    results['matches_recorded'] = results['outcome'] == results['recorded_status']
+    return results
+
+
+def summarize_backtest(results_df):
+    """
+    Summarize backtest results per variant.
+
+    Parameters:
+    -----------
+    results_df : pd.DataFrame
+        Results from `backtest_trades`
+
+    Returns:
+    --------
+    pd.DataFrame
+        Per variant: trade counts, winrate, expectancy and total in R, and the
+        share of trades whose simulated outcome matches the recorded status
+    """
+    if results_df.empty:
+        return pd.DataFrame(columns=[
+            'variant', 'trades', 'wins', 'losses', 'open', 'winrate',
+            'expectancy_r', 'total_r', 'match_rate'
+        ])
+
+    grouped = results_df.groupby('variant', sort=False)
+    summary = pd.DataFrame({
+        'trades': grouped.size(),
+        'wins': grouped['outcome'].apply(lambda s: (s == 'Win').sum()),
+        'losses': grouped['outcome'].apply(lambda s: (s == 'Loss').sum()),
+        'open': grouped['outcome'].apply(lambda s: (s == 'Open').sum()),
+        'expectancy_r': grouped['r_multiple'].mean(),
+        'total_r': grouped['r_multiple'].sum(),
+        'match_rate': grouped['matches_recorded'].mean() * 100
+    })
+    decided = summary['wins'] + summary['losses']
+    summary['winrate'] = np.where(decided > 0, summary['wins'] / decided.where(decided > 0, 1) * 100, 0)
+
+    return summary.reset_index()[[
+        'variant', 'trades', 'wins', 'losses', 'open', 'winrate',
+        'expectancy_r', 'total_r', 'match_rate'
+    ]]
@@ -0,0 +1,219 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Upper bound on the number of sampled indices held in memory per chunk
+CHUNK_ELEMENTS = 2_000_000
+
+# Journals needing more sampled indices than this are resampled in parallel chunks
+PARALLEL_THRESHOLD = 5_000_000
+
+# Cap on total sampled indices; very large journals use fewer resamples, and
+# beyond MIN_RESAMPLES each resample draws fewer trades than the journal holds
+RESAMPLE_BUDGET = 20_000_000
+MIN_RESAMPLES = 1000
+
+# Shared by all calls, so concurrent sessions don't each start their own pool
+_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Memoized results keyed by journal version and bootstrap parameters
+_CACHE = {}
+_CACHE_SIZE = 32
+
+
+def _trade_arrays(trades_df):
+    """
+    Extract the per-trade arrays used by the bootstrap from closed trades.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+
+    Returns:
+    --------
+    np.ndarray
+        Matrix with one row per closed trade and one column per entry of
+        SUM_COLUMNS
+    """
+    closed = trades_df[trades_df['status'].isin(['Win', 'Loss'])]
+
+    win = (closed['status'] == 'Win').to_numpy()
+    rr = pd.to_numeric(closed['rr'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    result = pd.to_numeric(closed['result'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    # A win returns its planned R:R, a loss costs the full 1R
+    r_multiple = np.where(win, rr, -1.0)
+
+    return np.column_stack([
+        win.astype(float),
+        rr,
+        r_multiple,
+        result,
+        np.maximum(result, 0),
+        np.maximum(-result, 0)
+    ])
+
+
+def _statistics(sums, n_trades):
+    """
+    Derive the reported statistics from per-sample column sums.
+
+    Parameters:
+    -----------
+    sums : np.ndarray
+        Column sums of the trade matrix, one row per sample
+    n_trades : int
+        Number of trades in each sample
+
+    Returns:
+    --------
+    dict
+        Arrays of statistics, one value per sample
+    """
+    win, rr, r_multiple, result, gross_profit, gross_loss = sums.T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss, np.nan)
+
+    return {
+        "winrate": win / n_trades * 100,
+        "avg_rr": rr / n_trades,
+        "expectancy": r_multiple / n_trades,
+        "profit_factor": profit_factor,
+        "total_pnl": result
+    }
+
+
+def _resample_chunk(trades, n_resamples, seed, sample_size=None):
+    """
+    Compute the bootstrap statistics for one chunk of resamples.
+
+    Each full-size resample is reduced to how many times it drew every
+    trade, so all statistics come out of a single matrix product instead of
+    one gather per column.
+
+    Parameters:
+    -----------
+    trades : np.ndarray
+        Trade matrix from `_trade_arrays`
+    n_resamples : int
+        Number of resamples in this chunk
+    seed : np.random.SeedSequence
+        Seed for this chunk's random generator
+    sample_size : int, optional
+        Trades drawn per resample, defaults to all of them
+
+    Returns:
+    --------
+    dict
+        Arrays of resampled statistics, one value per resample
+    """
+    rng = np.random.default_rng(seed)
+    n_trades = len(trades)
+    if sample_size is not None and sample_size < n_trades:
+        # Fewer draws than trades: summing the draws is cheaper than counting them
+        idx = rng.integers(0, n_trades, size=(n_resamples, sample_size))
+        sums = np.column_stack([trades[idx, j].sum(axis=1) for j in range(trades.shape[1])])
+        return _statistics(sums, sample_size)
+
+    idx = rng.integers(0, n_trades, size=(n_resamples, n_trades))
+
+    # Offset each resample into its own row of the flattened count matrix
+    idx += np.arange(n_resamples)[:, None] * n_trades
+    counts = np.bincount(idx.ravel(), minlength=n_resamples * n_trades)
+    counts = counts.reshape(n_resamples, n_trades).astype(float)
+
+    return _statistics(counts @ trades, n_trades)
+
+
+def bootstrap_trade_statistics(trades_df, n_resamples=20000, confidence=95,
+                               version=None, seed=None):
+    """
+    Calculate bootstrap confidence intervals for the journal statistics.
+
+    Closed trades are resampled with replacement using vectorized index
+    arrays. Large journals are processed in bounded chunks spread over a
+    shared thread pool. Journals too large for MIN_RESAMPLES full resamples
+    within RESAMPLE_BUDGET draw fewer trades per resample, and the spread of
+    those resamples is scaled back to the journal size.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+    n_resamples : int
+        Number of bootstrap resamples, reduced (down to MIN_RESAMPLES) for
+        journals where it would exceed RESAMPLE_BUDGET sampled indices; the
+        total never exceeds the budget
+    confidence : float
+        Confidence level as a percentage (e.g., 95 for 95%)
+    version : hashable, optional
+        Journal version (see `TradeJournal.get_version`); results are memoized per version
+    seed : int, optional
+        Seed for reproducible resampling
+
+    Returns:
+    --------
+    dict or None
+        For each of winrate, avg_rr, expectancy, profit_factor and total_pnl a
+        dict with estimate, lower and upper. None if there are fewer than two
+        closed trades.
+    """
+    cache_key = None
+    if version is not None:
+        cache_key = (version, n_resamples, confidence, seed)
+        if cache_key in _CACHE:
+            return _CACHE[cache_key]
+
+    trades = _trade_arrays(trades_df)
+    n_trades = len(trades)
+    if n_trades < 2:
+        return None
+
+    n_resamples = max(min(n_resamples, RESAMPLE_BUDGET // n_trades), MIN_RESAMPLES)
+    sample_size = min(n_trades, max(2, RESAMPLE_BUDGET // n_resamples))
+
+    # Split resamples so each chunk holds at most CHUNK_ELEMENTS sampled indices
+    chunk_size = max(1, min(n_resamples, CHUNK_ELEMENTS // sample_size))
+    chunk_sizes = [chunk_size] * (n_resamples // chunk_size)
+    if n_resamples % chunk_size:
+        chunk_sizes.append(n_resamples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    if n_resamples * sample_size > PARALLEL_THRESHOLD and len(chunk_sizes) > 1:
+        chunks = list(_EXECUTOR.map(
+            lambda args: _resample_chunk(trades, *args, sample_size), zip(chunk_sizes, seeds)
+        ))
+    else:
+        chunks = [_resample_chunk(trades, size, s, sample_size) for size, s in zip(chunk_sizes, seeds)]
+
+    alpha = (100 - confidence) / 2
+    estimates = _statistics(trades.sum(axis=0, keepdims=True), n_trades)
+    intervals = {}
+    for metric, estimate in estimates.items():
+        samples = np.concatenate([chunk[metric] for chunk in chunks])
+        if sample_size < n_trades:
+            # Spread shrinks with the square root of the sample size (m-out-of-n bootstrap)
+            if metric == "total_pnl":
+                samples = samples * n_trades / sample_size
+            samples = estimate[0] + (samples - estimate[0]) * np.sqrt(sample_size / n_trades)
+        if np.isnan(samples).all():
+            lower, upper = np.nan, np.nan
+        else:
+            lower, upper = np.nanpercentile(samples, [alpha, 100 - alpha])
+        intervals[metric] = {
+            "estimate": float(estimate[0]),
+            "lower": float(lower),
+            "upper": float(upper)
+        }
+
+    if cache_key is not None:
+        if len(_CACHE) >= _CACHE_SIZE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[cache_key] = intervals
+
+    return intervals
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+CHECKPOINT_VERSION = 1
+
+# Text columns with at most this many distinct values are stored as category codes
+MAX_CATEGORIES = 4096
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file_prefix(path, length):
+    """
+    Hash the first `length` bytes of a file.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the file
+    length : int
+        Number of bytes to hash
+
+    Returns:
+    --------
+    str
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(_HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _write_column(ckpt_dir, name, series, numeric=False):
+    """
+    Write one column as memory-mappable .npy files.
+
+    Numeric columns are stored as is, low-cardinality text as integer codes
+    plus a category list, and other text as fixed-width strings with a null mask.
+    Columns flagged as numeric are always stored as float64, so numbers in an
+    object column are never written back as text.
+
+    Parameters:
+    -----------
+    ckpt_dir : str
+        Checkpoint directory
+    name : str
+        Column name
+    series : pd.Series
+        Column values
+    numeric : bool
+        Whether the column must be stored as numbers
+
+    Returns:
+    --------
+    dict
+        Column description stored in the checkpoint metadata
+    """
+    if numeric:
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+        np.save(os.path.join(ckpt_dir, f"{name}.npy"), values)
+        return {"name": name, "encoding": "numeric"}
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        np.save(os.path.join(ckpt_dir, f"{name}.npy"), series.to_numpy())
+        return {"name": name, "encoding": "numeric"}
+
+    values = series.astype(object)
+    nulls = values.isna().to_numpy()
+    categories = pd.unique(values[~nulls])
+    if len(categories) <= MAX_CATEGORIES:
+        codes = pd.Categorical(values, categories=categories).codes
+        np.save(os.path.join(ckpt_dir, f"{name}.npy"), codes)
+        return {"name": name, "encoding": "category", "categories": [str(c) for c in categories]}
+
+    np.save(os.path.join(ckpt_dir, f"{name}.npy"), values.where(~nulls, "").astype(str).to_numpy(dtype=str))
+    np.save(os.path.join(ckpt_dir, f"{name}.mask.npy"), nulls)
+    return {"name": name, "encoding": "text"}
+
+
+def _read_column(ckpt_dir, column):
+    """
+    Read one column written by `_write_column`.
+
+    Parameters:
+    -----------
+    ckpt_dir : str
+        Checkpoint directory
+    column : dict
+        Column description from the checkpoint metadata
+
+    Returns:
+    --------
+    np.ndarray or pd.Categorical
+        Column values
+    """
+    values = np.load(os.path.join(ckpt_dir, f"{column['name']}.npy"), mmap_mode='r')
+
+    if column['encoding'] == "numeric":
+        return np.array(values)
+    if column['encoding'] == "category":
+        categories = pd.Index(column['categories'], dtype=object)
+        return np.asarray(pd.Categorical.from_codes(np.asarray(values), categories), dtype=object)
+
+    nulls = np.load(os.path.join(ckpt_dir, f"{column['name']}.mask.npy"), mmap_mode='r')
+    values = np.asarray(values).astype(object)
+    values[np.asarray(nulls)] = np.nan
+    return values
+
+
+def write_checkpoint(ckpt_dir, trades_df, source_file, aggregates=None, numeric_columns=(), source_size=None):
+    """
+    Write a binary checkpoint of a journal.
+
+    The checkpoint is built in its own temporary directory and swapped into
+    place, so a reader never sees a partially written checkpoint and
+    concurrent writers never share a staging directory. When two writers race,
+    the last swap wins; either checkpoint is validated against the journal on
+    read.
+
+    Parameters:
+    -----------
+    ckpt_dir : str
+        Checkpoint directory
+    trades_df : pd.DataFrame
+        Trades exactly as stored in `source_file`
+    source_file : str
+        Journal CSV the checkpoint covers
+    aggregates : dict, optional
+        JSON-serializable aggregates and NumPy arrays stored with the checkpoint
+    numeric_columns : iterable
+        Columns always stored as float64
+    source_size : int, optional
+        Length of the prefix of `source_file` holding `trades_df`; defaults
+        to the whole file, rows appended later are read as its tail
+
+    Returns:
+    --------
+    bool
+        True if the checkpoint was written successfully
+    """
+    parent = os.path.dirname(os.path.abspath(ckpt_dir))
+    tmp_dir = None
+    try:
+        tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(ckpt_dir) + ".", suffix=".tmp", dir=parent)
+
+        columns = [
+            _write_column(tmp_dir, name, trades_df[name], numeric=name in numeric_columns)
+            for name in trades_df.columns
+        ]
+
+        arrays = {}
+        values = {}
+        for key, value in (aggregates or {}).items():
+            if isinstance(value, np.ndarray):
+                np.save(os.path.join(tmp_dir, f"aggregate.{key}.npy"), value)
+                arrays[key] = f"aggregate.{key}.npy"
+            else:
+                values[key] = value
+
+        if source_size is None:
+            source_size = os.path.getsize(source_file)
+        meta = {
+            "version": CHECKPOINT_VERSION,
+            "rows": len(trades_df),
+            "columns": columns,
+            "source_size": source_size,
+            "source_hash": hash_file_prefix(source_file, source_size),
+            "aggregates": values,
+            "aggregate_arrays": arrays
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, default=float)
+
+        # Directories can't be replaced while they have files, so move the old one aside first
+        old_dir = tmp_dir + ".old"
+        try:
+            os.replace(ckpt_dir, old_dir)
+        except FileNotFoundError:
+            old_dir = None
+        try:
+            os.replace(tmp_dir, ckpt_dir)
+        except OSError:
+            # Another writer swapped its checkpoint in first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        finally:
+            if old_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+        return True
+    except Exception as e:
+        print(f"Error writing checkpoint: {e}")
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return False
+
+
+def read_checkpoint(ckpt_dir, source_file):
+    """
+    Read a checkpoint if it still matches the start of the journal file.
+
+    Parameters:
+    -----------
+    ckpt_dir : str
+        Checkpoint directory
+    source_file : str
+        Journal CSV the checkpoint should cover
+
+    Returns:
+    --------
+    tuple or None
+        Trades DataFrame, the number of bytes of `source_file` it covers and
+        the stored aggregates; None if there is no valid checkpoint
+    """
+    meta_file = os.path.join(ckpt_dir, "meta.json")
+    if not os.path.exists(meta_file) or not os.path.exists(source_file):
+        return None
+
+    try:
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("version") != CHECKPOINT_VERSION:
+            return None
+        if os.path.getsize(source_file) < meta['source_size']:
+            return None
+        if hash_file_prefix(source_file, meta['source_size']) != meta['source_hash']:
+            return None
+
+        trades_df = pd.DataFrame({
+            column['name']: _read_column(ckpt_dir, column) for column in meta['columns']
+        })
+
+        aggregates = dict(meta['aggregates'])
+        for key, filename in meta['aggregate_arrays'].items():
+            aggregates[key] = np.load(os.path.join(ckpt_dir, filename))
+
+        return trades_df, meta['source_size'], aggregates
+    except Exception as e:
+        print(f"Error reading checkpoint: {e}")
+        return None
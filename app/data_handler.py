@@ -1,17 +1,149 @@
 import pandas as pd
+import numpy as np
 import os
+import io
+import json
+import uuid
+import tempfile
 import datetime
 
+from rolling import DEFAULT_WINDOWS, RollingMetrics, closed_trade_values
+from checkpoint import read_checkpoint, write_checkpoint
+from sync import NUMERIC_COLUMNS, id_hashes, row_hashes
+
+
+# Columns of the trade journal, in file order
+JOURNAL_COLUMNS = [
+    'trade_id', 'date', 'pair', 'entry_price', 'stop_loss', 'take_profit',
+    'position_size', 'result', 'status', 'rr', 'notes'
+]
+
+# Text columns are always read as text, so a chunk where one is empty or looks numeric
+# (e.g. notes) gets the same dtypes as every other chunk
+TEXT_DTYPES = {column: str for column in JOURNAL_COLUMNS if column not in NUMERIC_COLUMNS}
+
+# Number of pending patch records after which the journal is compacted on load
+COMPACT_THRESHOLD = 1000
+
+# Number of trades appended since the last checkpoint after which it is rewritten on load
+CHECKPOINT_REFRESH_ROWS = 10000
+
+# Format of the date column
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def _set_cell(df, row, column, value):
+    """
+    Set a single cell, upcasting the column if it can't hold the value.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        DataFrame to modify in place
+    row : int
+        Row label of the cell
+    column : str
+        Column name of the cell
+    value : object
+        New value
+    """
+    try:
+        df.at[row, column] = value
+    except (TypeError, ValueError):
+        df[column] = df[column].astype(object)
+        df.at[row, column] = value
+
+
+def _parse_dates(values):
+    """
+    Parse trade dates written in any common format.
+
+    Parameters:
+    -----------
+    values : pd.Series
+        Date values
+
+    Returns:
+    --------
+    pd.Series
+        Timestamps, NaT where a value is missing or not a date
+    """
+    return pd.to_datetime(values.astype(object), format="mixed", errors="coerce")
+
+
+def _normalize_date(value):
+    """
+    Convert a date entered by the user to the journal's date format.
+
+    Parameters:
+    -----------
+    value : object
+        Date as entered, e.g. "2024-01-02" or "2024-01-02 10:30"
+
+    Returns:
+    --------
+    str or None
+        Date formatted with DATE_FORMAT, None if the value is not a date
+    """
+    parsed = _parse_dates(pd.Series([value])).iloc[0]
+    return None if pd.isna(parsed) else parsed.strftime(DATE_FORMAT)
+
+
+def _coerce_numeric(df):
+    """
+    Store the numeric journal columns as float64.
+
+    Columns built from rows with missing values (e.g. the result of an open
+    trade) would otherwise end up as object columns mixing None and numbers.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        DataFrame to modify in place
+
+    Returns:
+    --------
+    pd.DataFrame
+        The same DataFrame
+    """
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+    return df
+
+
+def _json_default(value):
+    """
+    Convert NumPy scalars and other non-JSON values for the change log.
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
 
 class TradeJournal:
     """
     A class to handle trade journal operations: saving, loading, and analyzing trades.
+
+    New trades are appended to the journal CSV. Edits and deletions are
+    appended as patch and tombstone records to a change log next to it and
+    folded into the trades on load, so changing a single trade never rewrites
+    the whole journal. `compact` folds the change log back into the CSV.
+
+    Every full save also writes a binary checkpoint of the typed columns and
+    the rolling metrics state. On startup the checkpoint is used if it still
+    matches the start of the CSV, and only the trades appended after it are
+    parsed as text.
+
+    Row content hashes for syncing replicas are stored in the checkpoint too
+    and kept up to date as trades change, so they are only computed in full
+    when a checkpoint is written.
     """
-    
+
     def __init__(self, data_path="../data"):
         """
         Initialize the TradeJournal with a data path.
-        
+
         Parameters:
         -----------
         data_path : str
@@ -19,90 +151,706 @@ class TradeJournal:
         """
         self.data_path = data_path
         self.journal_file = os.path.join(data_path, "trade_journal.csv")
-        self.trades_df = self._load_trades()
-        
+        self.changes_file = os.path.join(data_path, "trade_journal_changes.jsonl")
+        self.checkpoint_dir = os.path.join(data_path, "trade_journal.ckpt")
+        self._rolling_seed = None
+
+        # Row hashes, plus trades deleted or updated since they were last brought up to date
+        self._row_hashes = None
+        self._hash_deleted = set()
+        self._hash_updated = set()
+
+        # Deleted trades whose rows are still in the CSV until the next compaction
+        self._tombstones = set()
+
         # Create data directory if it doesn't exist
         os.makedirs(data_path, exist_ok=True)
-    
+
+        # Rolling metrics over the last N closed trades
+        self.rolling = RollingMetrics()
+
+        self.trades_df = self._load_trades()
+        if self._rolling_seed is not None:
+            self.rolling.restore(self._rolling_seed)
+        else:
+            self.rolling.rebuild(self.trades_df)
+
     def _load_trades(self):
         """
         Load trades from CSV file or create an empty DataFrame if file doesn't exist.
-        
+
+        A valid checkpoint replaces parsing the part of the CSV it covers.
+        Pending change records are applied on top of the CSV contents. Journals
+        written before trade IDs existed get IDs assigned and are compacted once.
+
         Returns:
         --------
         pd.DataFrame
             DataFrame containing trade records
         """
-        if os.path.exists(self.journal_file):
-            return pd.read_csv(self.journal_file)
+        self._rolling_seed = None
+        self._row_hashes = None
+        checkpoint = read_checkpoint(self.checkpoint_dir, self.journal_file)
+
+        if checkpoint is not None:
+            trades_df, offset, aggregates = checkpoint
+            if len(aggregates.get('row_hashes', ())) == len(trades_df):
+                self._row_hashes = aggregates['row_hashes']
+            tail_df = self._read_tail(offset, list(trades_df.columns))
+            if not tail_df.empty:
+                trades_df = pd.concat([trades_df, tail_df], ignore_index=True)
+            # Also repairs checkpoints written before numeric columns were coerced
+            _coerce_numeric(trades_df)
+            if tail_df.empty or len(tail_df) < CHECKPOINT_REFRESH_ROWS:
+                self._rolling_seed = np.concatenate([
+                    aggregates['rolling_state'], closed_trade_values(tail_df)
+                ]) if 'rolling_state' in aggregates else None
+            else:
+                self._row_hashes = row_hashes(trades_df)
+                self._write_checkpoint(trades_df, self._row_hashes)
+        elif os.path.exists(self.journal_file):
+            trades_df = _coerce_numeric(pd.read_csv(self.journal_file, dtype={'trade_id': str}))
+            if 'trade_id' in trades_df.columns and len(trades_df) >= CHECKPOINT_REFRESH_ROWS:
+                self._row_hashes = row_hashes(trades_df)
+                self._write_checkpoint(trades_df, self._row_hashes)
         else:
-            # Define columns for the trade journal
-            columns = [
-                'date', 'pair', 'entry_price', 'stop_loss', 'take_profit', 
-                'position_size', 'result', 'status', 'rr', 'notes'
-            ]
+            trades_df = pd.DataFrame(columns=JOURNAL_COLUMNS)
+
+        needs_compaction = False
+        if 'trade_id' not in trades_df.columns:
+            trades_df.insert(0, 'trade_id', [self._new_trade_id() for _ in range(len(trades_df))])
+            needs_compaction = True
+
+        changes = self._read_changes()
+        if changes:
+            trades_df = self._apply_changes(trades_df, changes)
+            for change in changes:
+                if change.get('op') == 'delete':
+                    self._hash_deleted.add(change.get('trade_id'))
+                    self._tombstones.add(change.get('trade_id'))
+                elif change.get('op') == 'restore':
+                    self._hash_deleted.discard(change.get('trade_id'))
+                    self._hash_updated.add(change.get('trade_id'))
+                    self._tombstones.discard(change.get('trade_id'))
+                elif change.get('op') == 'update':
+                    self._hash_updated.add(change.get('trade_id'))
+            needs_compaction = needs_compaction or len(changes) >= COMPACT_THRESHOLD
+            self._rolling_seed = None
+
+        self.trades_df = trades_df
+        if needs_compaction:
+            self.compact()
+        return self.trades_df
+
+    def _read_tail(self, offset, columns):
+        """
+        Parse the trades appended to the CSV after a byte offset.
+
+        Parameters:
+        -----------
+        offset : int
+            Byte offset where the appended rows start
+        columns : list
+            Column names of the journal
+
+        Returns:
+        --------
+        pd.DataFrame
+            Appended trades, empty if there are none
+        """
+        with open(self.journal_file, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+
+        if not tail.strip():
             return pd.DataFrame(columns=columns)
-    
+        return pd.read_csv(io.BytesIO(tail), header=None, names=columns, dtype={'trade_id': str})
+
+    def _write_checkpoint(self, trades_df, hashes, source_size=None):
+        """
+        Write a binary checkpoint of trades that exactly match the journal CSV.
+
+        Parameters:
+        -----------
+        trades_df : pd.DataFrame
+            Trades as stored in the journal CSV, without pending changes applied
+        hashes : np.ndarray
+            Row hashes of `trades_df`
+        source_size : int, optional
+            Bytes of the journal CSV holding `trades_df`, if rows may have been appended since
+
+        Returns:
+        --------
+        bool
+            True if the checkpoint was written successfully
+        """
+        aggregates = {
+            "rolling_state": closed_trade_values(trades_df)[-max(DEFAULT_WINDOWS):],
+            "row_hashes": hashes
+        }
+        # Empty text reads back from the CSV as missing, so store it that way
+        text_columns = [c for c in trades_df.columns if c not in NUMERIC_COLUMNS]
+        trades_df = trades_df.assign(**{
+            c: trades_df[c].where(trades_df[c].astype(object) != "") for c in text_columns
+        })
+        return write_checkpoint(self.checkpoint_dir, trades_df, self.journal_file, aggregates,
+                                numeric_columns=NUMERIC_COLUMNS, source_size=source_size)
+
+    def _read_changes(self, path=None):
+        """
+        Read pending patch and tombstone records from the change log.
+
+        Parameters:
+        -----------
+        path : str, optional
+            Change log to read instead of the journal's own
+
+        Returns:
+        --------
+        list
+            List of change records in the order they were written
+        """
+        path = path or self.changes_file
+        if not os.path.exists(path):
+            return []
+
+        changes = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    changes.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted save
+                    continue
+        return changes
+
+    @staticmethod
+    def _apply_changes(trades_df, changes):
+        """
+        Fold change records into a trades DataFrame.
+
+        A restore record brings back a deleted trade whose row is still in
+        the CSV, with all of its fields replaced.
+
+        Parameters:
+        -----------
+        trades_df : pd.DataFrame
+            DataFrame containing trade records
+        changes : list
+            Change records as read by `_read_changes`
+
+        Returns:
+        --------
+        pd.DataFrame
+            DataFrame with updates applied and deleted trades removed
+        """
+        # Only the last state of each trade matters
+        patches = {}
+        deleted = set()
+        for change in changes:
+            trade_id = change.get('trade_id')
+            if change.get('op') == 'delete':
+                deleted.add(trade_id)
+                patches.pop(trade_id, None)
+            elif change.get('op') == 'restore':
+                deleted.discard(trade_id)
+                patches[trade_id] = dict(change.get('fields', {}))
+            elif change.get('op') == 'update' and trade_id not in deleted:
+                patches.setdefault(trade_id, {}).update(change.get('fields', {}))
+
+        if deleted:
+            trades_df = trades_df[~trades_df['trade_id'].isin(deleted)].reset_index(drop=True)
+
+        if patches:
+            positions = pd.Index(trades_df['trade_id'])
+            for trade_id, fields in patches.items():
+                matches = positions.get_indexer([trade_id])
+                if matches[0] == -1:
+                    continue
+                for column, value in fields.items():
+                    if column in trades_df.columns and column != 'trade_id':
+                        _set_cell(trades_df, matches[0], column, value)
+
+        return trades_df
+
+    @staticmethod
+    def _new_trade_id():
+        """
+        Generate a new stable trade identifier.
+
+        Returns:
+        --------
+        str
+            Unique trade ID
+        """
+        return uuid.uuid4().hex[:16]
+
+    def _find_trade(self, trade_id):
+        """
+        Find the row position of a trade.
+
+        Parameters:
+        -----------
+        trade_id : str
+            ID of the trade
+
+        Returns:
+        --------
+        int or None
+            Row position of the trade, None if it doesn't exist
+        """
+        matches = self.trades_df.index[self.trades_df['trade_id'] == trade_id]
+        if len(matches) == 0:
+            return None
+        return matches[0]
+
+    def _append_change(self, change):
+        """
+        Append a change record to the change log.
+
+        Parameters:
+        -----------
+        change : dict
+            Change record to append
+
+        Returns:
+        --------
+        bool
+            True if the record was written successfully
+        """
+        try:
+            with open(self.changes_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(change, default=_json_default) + "\n")
+            return True
+        except Exception as e:
+            print(f"Error saving trade change: {e}")
+            return False
+
     def add_trade(self, trade_data):
         """
         Add a new trade to the journal.
-        
+
         Parameters:
         -----------
         trade_data : dict
-            Dictionary containing trade information
-            
+            Dictionary containing trade information; the date and trade ID
+            are filled in if missing
+
         Returns:
         --------
         bool
-            True if trade was added successfully
+            True if trade was added successfully, False if its date is invalid
         """
         # Add current date if not provided
-        if 'date' not in trade_data:
-            trade_data['date'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        # Add the trade as a new row
-        self.trades_df = pd.concat([self.trades_df, pd.DataFrame([trade_data])], 
-                                  ignore_index=True)
-        
-        # Save to file
-        return self._save_trades()
-    
-    def _save_trades(self):
+        if pd.isna(trade_data.get('date')) or trade_data.get('date') == "":
+            trade_data['date'] = datetime.datetime.now().strftime(DATE_FORMAT)
+        else:
+            date = _normalize_date(trade_data['date'])
+            if date is None:
+                print(f"Error saving trade: invalid date {trade_data['date']!r}")
+                return False
+            trade_data['date'] = date
+
+        # Assign a stable ID to the trade
+        if not trade_data.get('trade_id'):
+            trade_data['trade_id'] = self._new_trade_id()
+
+        # A trade deleted since the last compaction is restored like in add_trades
+        return self.add_trades(pd.DataFrame([trade_data]))
+
+    def add_trades(self, trades):
+        """
+        Add several trades to the journal with a single write.
+
+        Trades deleted since the last compaction are restored through the
+        change log instead, as their old rows are still in the CSV. Dates are
+        kept as given, so trades copied from another replica stay identical.
+
+        Parameters:
+        -----------
+        trades : pd.DataFrame
+            Trades to add; missing dates and trade IDs are filled in
+
+        Returns:
+        --------
+        bool
+            True if the trades were added successfully, False without adding
+            any if a date is invalid
+        """
+        if trades.empty:
+            return True
+
+        new_rows = _coerce_numeric(trades.reindex(columns=self.trades_df.columns).reset_index(drop=True))
+        # Columns missing from `trades` come back from reindex as all-NaN floats
+        new_rows['trade_id'] = new_rows['trade_id'].astype(object)
+        new_rows['date'] = new_rows['date'].astype(object)
+        if new_rows['date'].isna().any():
+            new_rows['date'] = new_rows['date'].fillna(datetime.datetime.now().strftime(DATE_FORMAT))
+        invalid = _parse_dates(new_rows['date']).isna()
+        if invalid.any():
+            print(f"Error saving trades: invalid dates {new_rows.loc[invalid, 'date'].tolist()}")
+            return False
+        missing_ids = new_rows['trade_id'].isna() | (new_rows['trade_id'] == "")
+        if missing_ids.any():
+            new_rows.loc[missing_ids, 'trade_id'] = [self._new_trade_id() for _ in range(missing_ids.sum())]
+
+        if self.trades_df.empty:
+            self.trades_df = new_rows
+        else:
+            self.trades_df = pd.concat([self.trades_df, new_rows], ignore_index=True)
+
+        restored = new_rows['trade_id'].isin(self._tombstones)
+        try:
+            if not restored.all():
+                new_rows[~restored].to_csv(self.journal_file, mode='a', index=False,
+                                           header=not os.path.exists(self.journal_file))
+            for trade_data in new_rows[restored].to_dict('records'):
+                trade_id = trade_data.pop('trade_id')
+                self._tombstones.discard(trade_id)
+                if not self._append_change({"op": "restore", "trade_id": trade_id, "fields": trade_data}):
+                    return False
+            for trade_data in new_rows.to_dict('records'):
+                self.rolling.push(trade_data)
+            return True
+        except Exception as e:
+            print(f"Error saving trades: {e}")
+            return False
+
+    def update_trade(self, trade_id, fields):
+        """
+        Update fields of an existing trade.
+
+        Parameters:
+        -----------
+        trade_id : str
+            ID of the trade to update
+        fields : dict
+            Column names mapped to their new values
+
+        Returns:
+        --------
+        bool
+            True if the trade was updated successfully
+        """
+        row = self._find_trade(trade_id)
+        if row is None:
+            return False
+
+        fields = {k: v for k, v in fields.items()
+                  if k in self.trades_df.columns and k != 'trade_id'}
+        if not fields:
+            return True
+        if 'date' in fields:
+            date = _normalize_date(fields['date'])
+            if date is None:
+                print(f"Error saving trade change: invalid date {fields['date']!r}")
+                return False
+            fields['date'] = date
+
+        for column, value in fields.items():
+            _set_cell(self.trades_df, row, column, value)
+
+        if {'status', 'rr', 'result'} & set(fields):
+            self.rolling.rebuild(self.trades_df)
+        self._hash_updated.add(trade_id)
+
+        return self._append_change({"op": "update", "trade_id": trade_id, "fields": fields})
+
+    def delete_trade(self, trade_id):
+        """
+        Delete a trade from the journal.
+
+        Parameters:
+        -----------
+        trade_id : str
+            ID of the trade to delete
+
+        Returns:
+        --------
+        bool
+            True if the trade was deleted successfully
+        """
+        row = self._find_trade(trade_id)
+        if row is None:
+            return False
+
+        self.trades_df = self.trades_df.drop(index=row).reset_index(drop=True)
+        self.rolling.rebuild(self.trades_df)
+        self._hash_deleted.add(trade_id)
+        self._tombstones.add(trade_id)
+        return self._append_change({"op": "delete", "trade_id": trade_id})
+
+    def compact(self):
+        """
+        Fold pending changes into the journal CSV and clear the change log.
+
+        Other sessions may append trades or change records meanwhile. The
+        change log is renamed before it is read, so later records go to a new
+        log, and the journal is rebuilt from the CSV on disk, so trades
+        appended since this journal was loaded are kept.
+
+        Returns:
+        --------
+        bool
+            True if the journal was compacted successfully
+        """
+        return self._rewrite(from_disk=True)
+
+    def _take_changes(self):
+        """
+        Move the change log aside so new records start a new log.
+
+        Returns:
+        --------
+        str or None
+            Path of the moved log, None if there was no log
+        """
+        pending = f"{self.changes_file}.{uuid.uuid4().hex}.compacting"
+        try:
+            os.replace(self.changes_file, pending)
+            return pending
+        except FileNotFoundError:
+            return None
+
+    def _read_journal_file(self):
+        """
+        Read the journal CSV as it is on disk.
+
+        Returns:
+        --------
+        tuple
+            Trades (None if there is no journal with trade IDs yet) and the
+            number of bytes they were read from
+        """
+        try:
+            with open(self.journal_file, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, None
+        if not data.strip():
+            return None, None
+
+        trades_df = pd.read_csv(io.BytesIO(data), dtype=TEXT_DTYPES)
+        if 'trade_id' not in trades_df.columns:
+            return None, None
+        return _coerce_numeric(trades_df), len(data)
+
+    def _rewrite(self, from_disk):
+        """
+        Rewrite the journal CSV and start an empty change log.
+
+        Parameters:
+        -----------
+        from_disk : bool
+            Rebuild the trades from the CSV and change log on disk; otherwise
+            the trades in memory are written and pending records are dropped
+
+        Returns:
+        --------
+        bool
+            True if the journal was rewritten successfully
+        """
+        pending = None
+        try:
+            pending = self._take_changes()
+            trades_df, read_size = self._read_journal_file() if from_disk else (None, None)
+            if trades_df is None:
+                trades_df = self.trades_df
+            elif pending is not None:
+                trades_df = self._apply_changes(trades_df, self._read_changes(pending))
+
+            if not self._save_trades(trades_df, read_size):
+                raise OSError("journal was not saved")
+            if pending is not None:
+                os.remove(pending)
+            self._tombstones = set()
+            return True
+        except Exception as e:
+            print(f"Error compacting journal: {e}")
+            if pending is not None and os.path.exists(pending):
+                # Put the records back; they follow any written since the log was moved
+                with open(pending, "r", encoding="utf-8") as src, \
+                        open(self.changes_file, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(pending)
+            return False
+
+    def _save_trades(self, trades_df, read_size=None):
         """
         Save trades to CSV file.
-        
+
+        The file is written to its own temporary file first and then moved
+        into place, so an interrupted save never leaves a truncated journal
+        and concurrent saves never share a file.
+
+        Parameters:
+        -----------
+        trades_df : pd.DataFrame
+            Trades to write
+        read_size : int, optional
+            Bytes of the CSV `trades_df` was read from; rows appended after
+            them are carried over into the new file
+
         Returns:
         --------
         bool
             True if trades were saved successfully
         """
+        tmp_file = None
         try:
-            self.trades_df.to_csv(self.journal_file, index=False)
+            fd, tmp_file = tempfile.mkstemp(prefix="trade_journal.", suffix=".csv.tmp", dir=self.data_path)
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                trades_df.to_csv(f, index=False)
+
+            if read_size is not None:
+                with open(self.journal_file, "rb") as f:
+                    f.seek(read_size)
+                    appended = f.read()
+                if appended.strip():
+                    with open(tmp_file, "ab") as f:
+                        f.write(appended)
+                    appended_df = _coerce_numeric(pd.read_csv(
+                        io.BytesIO(appended), header=None, names=list(trades_df.columns), dtype=TEXT_DTYPES
+                    ))
+                    trades_df = pd.concat([trades_df, appended_df], ignore_index=True)
+
+            written = os.path.getsize(tmp_file)
+            os.replace(tmp_file, self.journal_file)
+            tmp_file = None
+
+            self.trades_df = trades_df
+            self._row_hashes = None
+            self._hash_deleted = set()
+            self._hash_updated = set()
+            self.rolling.rebuild(trades_df)
+            self._write_checkpoint(trades_df, self.get_row_hashes(), source_size=written)
             return True
         except Exception as e:
             print(f"Error saving trades: {e}")
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return False
-    
+
     def get_trades(self):
         """
         Get all trades as a DataFrame.
-        
+
         Returns:
         --------
         pd.DataFrame
             DataFrame containing all trade records
         """
         return self.trades_df
-    
+
+    def iter_trades(self, chunksize=50000):
+        """
+        Iterate over the journal in chunks read straight from disk.
+
+        Pending change records are applied to each chunk, so the chunks match
+        `get_trades` without the whole journal being held in memory. Every
+        chunk has the same dtypes: text columns as text and numeric columns
+        as float64.
+
+        Parameters:
+        -----------
+        chunksize : int
+            Maximum number of trades per chunk
+
+        Yields:
+        -------
+        pd.DataFrame
+            Consecutive chunks of trade records
+        """
+        if not os.path.exists(self.journal_file):
+            return
+
+        changes = self._read_changes()
+        with pd.read_csv(self.journal_file, dtype=TEXT_DTYPES, chunksize=chunksize) as reader:
+            for chunk in reader:
+                _coerce_numeric(chunk)
+                if changes:
+                    chunk = self._apply_changes(chunk.reset_index(drop=True), changes)
+                if not chunk.empty:
+                    yield chunk
+
+    def get_open_trades(self):
+        """
+        Get the trades that are still open.
+
+        Returns:
+        --------
+        pd.DataFrame
+            DataFrame containing trades with status "Open"
+        """
+        return self.trades_df[self.trades_df['status'] == 'Open']
+
+    def get_row_hashes(self):
+        """
+        Get the trade ID and content hash of every trade, in journal order.
+
+        Trades appended, updated or deleted since the last call are the only
+        ones rehashed.
+
+        Returns:
+        --------
+        np.ndarray
+            (n, 2) uint64 array from `sync.row_hashes`
+        """
+        hashes = self._row_hashes
+        if hashes is not None and self._hash_deleted:
+            hashes = hashes[~np.isin(hashes[:, 0], id_hashes(self._hash_deleted))]
+
+        # Cached hashes cover the first rows; later rows were appended since
+        if hashes is None or len(hashes) > len(self.trades_df):
+            hashes = row_hashes(self.trades_df)
+        else:
+            if self._hash_updated:
+                hashes = hashes.copy()
+                rows = np.flatnonzero(np.isin(hashes[:, 0], id_hashes(self._hash_updated)))
+                hashes[rows] = row_hashes(self.trades_df.iloc[rows])
+            if len(hashes) < len(self.trades_df):
+                hashes = np.concatenate([hashes, row_hashes(self.trades_df.iloc[len(hashes):])])
+
+        self._row_hashes = hashes
+        self._hash_deleted = set()
+        self._hash_updated = set()
+        return hashes
+
+    def get_version(self):
+        """
+        Get a version key that changes whenever the journal changes on disk.
+
+        Used to memoize analytics across Streamlit reruns without hashing
+        the trades themselves.
+
+        Returns:
+        --------
+        tuple
+            Journal path plus modification time and size of the journal and
+            change log files
+        """
+        version = [self.journal_file]
+        for path in (self.journal_file, self.changes_file):
+            try:
+                stat = os.stat(path)
+                version.extend([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                version.extend([0, 0])
+        return tuple(version)
+
     def clear_trades(self):
         """
         Clear all trades from the journal.
-        
+
         Returns:
         --------
         bool
             True if trades were cleared successfully
         """
         self.trades_df = pd.DataFrame(columns=self.trades_df.columns)
-        return self._save_trades() 
\ No newline at end of file
+        self.rolling.rebuild(self.trades_df)
+        self._row_hashes = None
+        return self._rewrite(from_disk=False)
@@ -0,0 +1,394 @@
+import numpy as np
+import pandas as pd
+
+
+# Supported export formats mapped to file extension and MIME type
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "jsonl": (".jsonl", "application/jsonl"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+}
+
+REPORTS = ["trades", "stats", "pair_breakdown", "equity_curve"]
+
+# Larger exports are left on disk instead of being offered as a browser download,
+# which Streamlit holds in memory
+MAX_DOWNLOAD_BYTES = 50 * 1024 * 1024
+
+
+def filter_trades(chunk, filters=None, columns=None):
+    """
+    Apply export filters and column selection to a chunk of trades.
+
+    Parameters:
+    -----------
+    chunk : pd.DataFrame
+        Chunk of trade records
+    filters : dict, optional
+        Any of pairs (list), statuses (list), date_from and date_to
+    columns : list, optional
+        Columns to keep, in order
+
+    Returns:
+    --------
+    pd.DataFrame
+        Filtered chunk
+    """
+    filters = filters or {}
+    mask = pd.Series(True, index=chunk.index)
+
+    if filters.get('pairs'):
+        mask &= chunk['pair'].isin(filters['pairs'])
+    if filters.get('statuses'):
+        mask &= chunk['status'].isin(filters['statuses'])
+    if filters.get('date_from') is not None or filters.get('date_to') is not None:
+        dates = pd.to_datetime(chunk['date'], errors='coerce')
+        if filters.get('date_from') is not None:
+            mask &= dates >= pd.Timestamp(filters['date_from'])
+        if filters.get('date_to') is not None:
+            mask &= dates <= pd.Timestamp(filters['date_to'])
+
+    chunk = chunk[mask]
+    if columns:
+        chunk = chunk[[col for col in columns if col in chunk.columns]]
+    return chunk
+
+
+def _pair_totals(chunk):
+    """
+    Sum the per-pair counters of one chunk of trades.
+
+    Parameters:
+    -----------
+    chunk : pd.DataFrame
+        Chunk of trade records
+
+    Returns:
+    --------
+    pd.DataFrame
+        Per-pair trades, wins, losses, open trades, result total and R:R sum/count
+    """
+    closed = chunk['status'] != 'Open'
+    result = pd.to_numeric(chunk['result'], errors='coerce').where(closed)
+    rr = pd.to_numeric(chunk['rr'], errors='coerce').where(closed)
+
+    return pd.DataFrame({
+        'trades': 1,
+        'wins': (chunk['status'] == 'Win').astype(int),
+        'losses': (chunk['status'] == 'Loss').astype(int),
+        'open': (~closed).astype(int),
+        'total_pnl': result.fillna(0),
+        'rr_sum': rr.fillna(0),
+        'rr_count': rr.notna().astype(int)
+    }).groupby(chunk['pair']).sum()
+
+
+def _finish_breakdown(totals):
+    """
+    Derive winrate and average R:R from summed per-pair counters.
+
+    Parameters:
+    -----------
+    totals : pd.DataFrame
+        Counters from `_pair_totals`, indexed by pair
+
+    Returns:
+    --------
+    pd.DataFrame
+        Per-pair breakdown
+    """
+    decided = totals['wins'] + totals['losses']
+    breakdown = totals.assign(
+        winrate=np.where(decided > 0, totals['wins'] / decided.where(decided > 0, 1) * 100, 0),
+        avg_rr=np.where(totals['rr_count'] > 0, totals['rr_sum'] / totals['rr_count'].where(totals['rr_count'] > 0, 1), 0)
+    )
+    breakdown = breakdown.reset_index().rename(columns={'index': 'pair'})
+    return breakdown[['pair', 'trades', 'wins', 'losses', 'open', 'winrate', 'avg_rr', 'total_pnl']]
+
+
+def iter_report(chunks, report="trades", filters=None, columns=None):
+    """
+    Turn a stream of trade chunks into a stream of report chunks.
+
+    Aggregate reports (stats, pair_breakdown) only keep running per-pair
+    counters between chunks; the equity curve carries its running total.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Chunks of trade records, e.g. `TradeJournal.iter_trades()`
+    report : str
+        One of REPORTS
+    filters : dict, optional
+        Filters passed to `filter_trades`
+    columns : list, optional
+        Columns to keep in the trades report
+
+    Yields:
+    -------
+    pd.DataFrame
+        Report chunks
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report: {report}")
+
+    if report == "trades":
+        for chunk in chunks:
+            chunk = filter_trades(chunk, filters, columns)
+            if not chunk.empty:
+                yield chunk
+        return
+
+    if report == "equity_curve":
+        equity = 0.0
+        for chunk in chunks:
+            chunk = filter_trades(chunk, filters)
+            chunk = chunk[chunk['status'] != 'Open']
+            if chunk.empty:
+                continue
+            result = pd.to_numeric(chunk['result'], errors='coerce').fillna(0)
+            curve = pd.DataFrame({
+                'trade_id': chunk['trade_id'],
+                'date': chunk['date'],
+                'pair': chunk['pair'],
+                'result': result,
+                'equity': equity + result.cumsum()
+            })
+            equity = float(curve['equity'].iloc[-1])
+            yield curve
+        return
+
+    totals = None
+    for chunk in chunks:
+        chunk = filter_trades(chunk, filters)
+        if chunk.empty:
+            continue
+        chunk_totals = _pair_totals(chunk)
+        totals = chunk_totals if totals is None else totals.add(chunk_totals, fill_value=0)
+
+    if totals is None:
+        return
+
+    if report == "pair_breakdown":
+        yield _finish_breakdown(totals)
+        return
+
+    overall = totals.sum()
+    decided = overall['wins'] + overall['losses']
+    yield pd.DataFrame([{
+        'trades': int(overall['trades']),
+        'win_count': int(overall['wins']),
+        'loss_count': int(overall['losses']),
+        'open_count': int(overall['open']),
+        'winrate': overall['wins'] / decided * 100 if decided else 0,
+        'avg_rr': overall['rr_sum'] / overall['rr_count'] if overall['rr_count'] else 0,
+        'total_pnl': overall['total_pnl']
+    }])
+
+
+def _write_csv(chunks, output):
+    """
+    Write chunks as one CSV file with a single header row.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Report chunks
+    output : binary file-like
+        Open binary file to write to
+    """
+    header = True
+    for chunk in chunks:
+        output.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+
+
+def _write_jsonl(chunks, output):
+    """
+    Write chunks as JSON Lines, one record per line.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Report chunks
+    output : binary file-like
+        Open binary file to write to
+    """
+    for chunk in chunks:
+        text = chunk.to_json(orient="records", lines=True, date_format="iso")
+        output.write(text.encode("utf-8"))
+        if not text.endswith("\n"):
+            output.write(b"\n")
+
+
+def _arrow_schema(chunk):
+    """
+    Get the Parquet schema of a report from the column dtypes of its first chunk.
+
+    The schema follows the dtypes rather than the values, so a column that is
+    empty in the first chunk (e.g. notes) is still typed as text.
+
+    Parameters:
+    -----------
+    chunk : pd.DataFrame
+        First report chunk
+
+    Returns:
+    --------
+    pa.Schema
+        Schema used for every row group
+    """
+    import pyarrow as pa
+
+    fields = []
+    for name, dtype in chunk.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype):
+            arrow_type = pa.int64()
+        elif pd.api.types.is_numeric_dtype(dtype):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(name), arrow_type))
+    return pa.schema(fields)
+
+
+def _write_parquet(chunks, output):
+    """
+    Write chunks as row groups of one Parquet file.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Report chunks
+    output : binary file-like
+        Open binary file to write to
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(output, _arrow_schema(chunk))
+            # Text columns may hold missing values or numbers read as text
+            text = [field.name for field in writer.schema if pa.types.is_string(field.type)]
+            chunk = chunk.astype({name: object for name in text})
+            chunk[text] = chunk[text].where(chunk[text].isna(), chunk[text].astype(str))
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(chunks, output):
+    """
+    Write chunks to one sheet of a write-only XLSX workbook.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Report chunks
+    output : binary file-like
+        Open binary file to write to
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("XLSX export requires openpyxl (pip install openpyxl)")
+
+    # Write-only workbooks stream rows instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Export")
+    header = True
+    for chunk in chunks:
+        if header:
+            sheet.append([str(col) for col in chunk.columns])
+            header = False
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+            sheet.append(list(row))
+    workbook.save(output)
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "parquet": _write_parquet,
+    "xlsx": _write_xlsx
+}
+
+
+def export_report(chunks, fmt, output):
+    """
+    Write a stream of report chunks in the given format.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Report chunks, e.g. from `iter_report`
+    fmt : str
+        One of EXPORT_FORMATS
+    output : str or binary file-like
+        Path or open binary file to write to
+
+    Returns:
+    --------
+    int
+        Number of rows written
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    rows = [0]
+
+    def counted(chunks):
+        for chunk in chunks:
+            rows[0] += len(chunk)
+            yield chunk
+
+    if isinstance(output, (str, bytes)) or hasattr(output, '__fspath__'):
+        with open(output, "wb") as f:
+            _WRITERS[fmt](counted(chunks), f)
+    else:
+        _WRITERS[fmt](counted(chunks), output)
+    return rows[0]
+
+
+def export_journal(journal, fmt, output, report="trades", filters=None, columns=None, chunksize=50000):
+    """
+    Export the journal or one of its analytics reports.
+
+    The journal is read from disk in chunks of `chunksize` trades and each
+    chunk is written before the next is read, so memory use does not grow
+    with the journal.
+
+    Parameters:
+    -----------
+    journal : TradeJournal
+        Journal to export
+    fmt : str
+        One of EXPORT_FORMATS
+    output : str or binary file-like
+        Path or open binary file to write to
+    report : str
+        One of REPORTS
+    filters : dict, optional
+        Filters passed to `filter_trades`
+    columns : list, optional
+        Columns to keep in the trades report
+    chunksize : int
+        Number of trades read per chunk
+
+    Returns:
+    --------
+    int
+        Number of rows written
+    """
+    chunks = iter_report(journal.iter_trades(chunksize), report, filters, columns)
+    return export_report(chunks, fmt, output)
@@ -0,0 +1,315 @@
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+
+# Contract specification of a tradable instrument
+Instrument = namedtuple("Instrument", ["symbol", "pip_size", "contract_size", "quote_currency", "base_currency"])
+
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CHF", "AUD", "NZD", "CAD"]
+
+# Assumed for instruments missing from the registry that don't look like currency
+# pairs: one price unit per pip and $10 per pip for one lot, as before the registry existed
+DEFAULT_PIP_SIZE = 1.0
+DEFAULT_PIP_VALUE = 10.0
+
+
+def normalize_pair(pair):
+    """
+    Normalize a pair name so "EUR/USD", "eurusd" and "EUR_USD" match.
+
+    Parameters:
+    -----------
+    pair : str
+        Pair name as written in the journal or the price feed
+
+    Returns:
+    --------
+    str
+        Upper-case pair name without separators
+    """
+    return str(pair).upper().replace("/", "").replace("_", "").replace(" ", "")
+
+
+def _fx(symbol):
+    """
+    Build the standard specification of a currency pair.
+
+    Parameters:
+    -----------
+    symbol : str
+        Normalized six-letter pair name, e.g. "EURUSD"
+
+    Returns:
+    --------
+    Instrument
+        Standard lot of 100,000 units; JPY-quoted pairs use 0.01 pips
+    """
+    quote = symbol[3:]
+    return Instrument(symbol, 0.01 if quote == "JPY" else 0.0001, 100000, quote, symbol[:3])
+
+
+INSTRUMENTS = {
+    **{base + quote: _fx(base + quote) for base in CURRENCIES for quote in CURRENCIES if base != quote},
+    # Metals
+    "XAUUSD": Instrument("XAUUSD", 0.1, 100, "USD", "XAU"),
+    "XAGUSD": Instrument("XAGUSD", 0.01, 5000, "USD", "XAG"),
+    # Indices
+    "US30": Instrument("US30", 1.0, 1, "USD", None),
+    "NAS100": Instrument("NAS100", 1.0, 1, "USD", None),
+    "SPX500": Instrument("SPX500", 0.1, 1, "USD", None),
+    "GER40": Instrument("GER40", 1.0, 1, "EUR", None),
+    "DE40": Instrument("DE40", 1.0, 1, "EUR", None),
+    "GER30": Instrument("GER30", 1.0, 1, "EUR", None),
+    "UK100": Instrument("UK100", 1.0, 1, "GBP", None),
+    "JP225": Instrument("JP225", 1.0, 1, "JPY", None),
+    # Crypto
+    "BTCUSD": Instrument("BTCUSD", 1.0, 1, "USD", "BTC"),
+    "ETHUSD": Instrument("ETHUSD", 0.1, 1, "USD", "ETH"),
+}
+
+
+def get_instrument(pair):
+    """
+    Look up the specification of an instrument.
+
+    Parameters:
+    -----------
+    pair : str
+        Instrument name in any format accepted by `normalize_pair`
+
+    Returns:
+    --------
+    Instrument
+        Registered specification; unregistered six-letter names are treated
+        as currency pairs
+
+    Raises:
+    -------
+    ValueError
+        If the instrument is unknown
+    """
+    symbol = normalize_pair(pair)
+    if symbol in INSTRUMENTS:
+        return INSTRUMENTS[symbol]
+    if len(symbol) == 6 and symbol.isalpha():
+        return _fx(symbol)
+    raise ValueError(f"Unknown instrument: {pair}")
+
+
+def is_known_instrument(pair):
+    """
+    Check whether an instrument has a specification.
+
+    Parameters:
+    -----------
+    pair : str
+        Instrument name
+
+    Returns:
+    --------
+    bool
+        True if `get_instrument` can look it up
+    """
+    try:
+        get_instrument(pair)
+        return True
+    except ValueError:
+        return False
+
+
+def pip_size(pair):
+    """
+    Get the price increment of one pip for an instrument.
+
+    Parameters:
+    -----------
+    pair : str
+        Instrument name
+
+    Returns:
+    --------
+    float
+        Pip size from the instrument registry (six-letter names as currency
+        pairs); DEFAULT_PIP_SIZE for other unknown instruments
+    """
+    try:
+        return get_instrument(pair).pip_size
+    except ValueError:
+        return DEFAULT_PIP_SIZE
+
+
+class CrossRateTable:
+    """
+    Currency conversion rates loaded from a local quotes file.
+
+    The quotes file is a CSV with pair and price columns (e.g. "EURUSD,1.08").
+    Rates missing from the file are derived by inversion or through USD.
+    The file is only re-read when it changes, and derived rates and pip
+    values are cached until then.
+    """
+
+    def __init__(self, quotes_file):
+        """
+        Initialize the table from a quotes file.
+
+        Parameters:
+        -----------
+        quotes_file : str
+            Path to the quotes CSV file; a missing file means no quotes
+        """
+        self.quotes_file = quotes_file
+        self._mtime = -1
+        self._quotes = {}
+        self._rates = {}
+        self._pip_values = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reload the quotes file if it changed since the last load.
+
+        Returns:
+        --------
+        bool
+            True if the quotes were reloaded
+        """
+        try:
+            mtime = os.stat(self.quotes_file).st_mtime_ns
+        except (OSError, TypeError):
+            mtime = None
+
+        if mtime == self._mtime:
+            return False
+
+        quotes = {}
+        if mtime is not None:
+            df = pd.read_csv(self.quotes_file)
+            df.columns = [col.strip().lower() for col in df.columns]
+            quotes = dict(zip(df['pair'].map(normalize_pair), pd.to_numeric(df['price'], errors='coerce')))
+
+        self._mtime = mtime
+        self._quotes = {k: float(v) for k, v in quotes.items() if v and v > 0}
+        self._rates = {}
+        self._pip_values = {}
+        return True
+
+    def _direct_rate(self, from_currency, to_currency):
+        """
+        Get a rate from a quote of the pair or its inverse.
+
+        Parameters:
+        -----------
+        from_currency : str
+            Currency to convert from
+        to_currency : str
+            Currency to convert to
+
+        Returns:
+        --------
+        float or None
+            Conversion rate, None if neither the pair nor its inverse is quoted
+        """
+        if from_currency == to_currency:
+            return 1.0
+        if from_currency + to_currency in self._quotes:
+            return self._quotes[from_currency + to_currency]
+        if to_currency + from_currency in self._quotes:
+            return 1.0 / self._quotes[to_currency + from_currency]
+        return None
+
+    def get_rate(self, from_currency, to_currency):
+        """
+        Get the price of one unit of a currency in another currency.
+
+        Parameters:
+        -----------
+        from_currency : str
+            Currency to convert from
+        to_currency : str
+            Currency to convert to
+
+        Returns:
+        --------
+        float or None
+            Conversion rate, None if the quotes don't allow the conversion
+        """
+        key = (from_currency, to_currency)
+        if key not in self._rates:
+            rate = self._direct_rate(from_currency, to_currency)
+            if rate is None:
+                via_usd = (self._direct_rate(from_currency, "USD"), self._direct_rate("USD", to_currency))
+                if None not in via_usd:
+                    rate = via_usd[0] * via_usd[1]
+            self._rates[key] = rate
+        return self._rates[key]
+
+    def pip_value(self, pair, account_currency="USD", price=None):
+        """
+        Get the value of one pip for one lot, in the account currency.
+
+        Parameters:
+        -----------
+        pair : str
+            Instrument name
+        account_currency : str
+            Currency of the trading account
+        price : float, optional
+            Current price of the instrument, used for the conversion when the
+            quotes file has no rate and the account currency is the base currency
+
+        Returns:
+        --------
+        float
+            Pip value per lot
+
+        Raises:
+        -------
+        ValueError
+            If the quote currency can't be converted to the account currency
+        """
+        instrument = get_instrument(pair)
+        key = (instrument.symbol, account_currency)
+        if key in self._pip_values:
+            return self._pip_values[key]
+
+        rate = self.get_rate(instrument.quote_currency, account_currency)
+        if rate is None and price and instrument.base_currency == account_currency:
+            # The instrument itself quotes the account currency, e.g. USDJPY for a USD account
+            return instrument.pip_size * instrument.contract_size / price
+        if rate is None:
+            raise ValueError(
+                f"No conversion rate from {instrument.quote_currency} to {account_currency}; "
+                f"add it to {self.quotes_file}"
+            )
+
+        value = instrument.pip_size * instrument.contract_size * rate
+        self._pip_values[key] = value
+        return value
+
+
+# Shared tables per quotes file, so Streamlit reruns reuse the cached rates
+_RATE_TABLES = {}
+
+
+def get_rate_table(quotes_file):
+    """
+    Get the shared cross-rate table of a quotes file, reloading it if it changed.
+
+    Parameters:
+    -----------
+    quotes_file : str
+        Path to the quotes CSV file
+
+    Returns:
+    --------
+    CrossRateTable
+        Up-to-date rate table
+    """
+    table = _RATE_TABLES.get(quotes_file)
+    if table is None:
+        table = _RATE_TABLES[quotes_file] = CrossRateTable(quotes_file)
+    else:
+        table.refresh()
+    return table
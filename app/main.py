@@ -4,14 +4,26 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 import sys
+import tempfile
 
 # Add app directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import custom modules
 from utils import (calculate_position_size, calculate_risk_reward_ratio, 
-                  calculate_expected_value, calculate_trade_statistics)
+                  calculate_expected_value, calculate_trade_statistics,
+                  calculate_distribution_expected_value)
 from data_handler import TradeJournal
+from bootstrap import bootstrap_trade_statistics
+from instruments import CURRENCIES, get_rate_table, is_known_instrument, pip_size
+from portfolio import build_positions, portfolio_risk, cap_new_position
+from rolling import DEFAULT_WINDOWS, rolling_metrics_history
+from price_stream import OpenTradeTracker, file_tick_source
+from backtest import backtest_trades, summarize_backtest
+from export import EXPORT_FORMATS, MAX_DOWNLOAD_BYTES, REPORTS, export_journal
+from management import (DEFAULT_VOLATILITY, calibrate_drift, random_walk_source, ohlc_source,
+                        simulate_management, summarize_management)
+from data_handler import JOURNAL_COLUMNS
 
 # Configure Streamlit's wide mode directly (hide from settings)
 st._config.set_option("ui.contentWidth", "wide")
@@ -29,8 +41,8 @@ st.set_page_config(
     }
 )
 
-# Initialize trade journal
-trade_journal = TradeJournal()
+# Initialize trade journal (TRADE_TOOLS_DATA overrides the data directory, e.g. for load tests)
+trade_journal = TradeJournal(os.environ.get("TRADE_TOOLS_DATA", "../data"))
 
 # Function to determine if dark mode is active
 def is_dark_theme():
@@ -249,12 +261,18 @@ def show_risk_calculator():
     
     with col1:
         st.subheader("Input Parameters")
-        account_balance = st.number_input("Modal Akun (USD)", min_value=1.0, value=1000.0, step=100.0)
+        account_currency = st.selectbox("Account Currency", options=CURRENCIES)
+        account_balance = st.number_input(f"Modal Akun ({account_currency})", min_value=1.0, value=1000.0, step=100.0)
+        pair = st.text_input("Pair (e.g., EUR/USD, XAU/USD, US30)", value="EUR/USD")
         risk_percentage = st.number_input("Risk per Trade (%)", min_value=0.1, max_value=10.0, value=1.0, step=0.1)
         entry_price = st.number_input("Entry Price", min_value=0.0001, value=1.0, format="%.4f", step=0.0001)
         stop_loss = st.number_input("Stop Loss", min_value=0.0001, value=0.9950, format="%.4f", step=0.0001)
         take_profit = st.number_input("Take Profit (Optional)", min_value=0.0, value=1.0100, format="%.4f", step=0.0001)
         
+        cap_to_portfolio = st.checkbox("Cap size against open positions", value=True)
+        risk_budget = st.number_input("Portfolio Risk Budget (%)", min_value=0.1, max_value=50.0, value=5.0, step=0.5,
+                                      disabled=not cap_to_portfolio)
+        
         calculate_button = st.button("Calculate", use_container_width=True)
     
     with col2:
@@ -262,9 +280,39 @@ def show_risk_calculator():
         
         if calculate_button:
             # Calculate position size and risk
-            position_size_result = calculate_position_size(
-                account_balance, risk_percentage, entry_price, stop_loss
-            )
+            rate_table = get_rate_table(os.path.join(trade_journal.data_path, "quotes.csv"))
+            try:
+                position_size_result = calculate_position_size(
+                    account_balance, risk_percentage, entry_price, stop_loss,
+                    pair=pair, account_currency=account_currency, rate_table=rate_table
+                )
+            except ValueError as e:
+                st.error(str(e))
+                return
+            
+            if not is_known_instrument(pair):
+                st.warning(f"{pair} is not in the instrument registry; sized with 1 pip = "
+                           f"{pip_size(pair)} and {position_size_result['pip_value']:.0f} per pip per lot.")
+            
+            # Cap the size against the risk already on in open positions
+            if cap_to_portfolio:
+                ohlc_dir = os.path.join(trade_journal.data_path, "ohlc")
+                ohlc_dir = ohlc_dir if os.path.isdir(ohlc_dir) else None
+                open_positions = build_positions(trade_journal.get_open_trades(), account_currency, rate_table)
+                risk = portfolio_risk(open_positions, account_balance, ohlc_dir)
+                new_position = build_positions(pd.DataFrame([{
+                    "pair": pair, "entry_price": entry_price, "stop_loss": stop_loss, "position_size": 1.0
+                }]), account_currency, rate_table)
+                
+                if not new_position.empty:
+                    max_size = cap_new_position(new_position, open_positions, account_balance,
+                                                risk_budget, ohlc_dir)
+                    if max_size < position_size_result['position_size']:
+                        st.warning(
+                            f"Position size capped from {position_size_result['position_size']:.2f} to "
+                            f"{max_size:.2f} lots to stay within the {risk_budget:.1f}% portfolio risk budget."
+                        )
+                        position_size_result['position_size'] = max_size
             
             # Calculate risk reward ratio if take profit is provided
             if take_profit > 0:
@@ -283,7 +331,7 @@ def show_risk_calculator():
             
             with metrics_col2:
                 st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                st.markdown(f"<div class='metric-value'>${position_size_result['risk_amount']:.2f}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-value'>{position_size_result['risk_amount']:.2f} {account_currency}</div>", unsafe_allow_html=True)
                 st.markdown("<div class='metric-label'>Risk Amount</div>", unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
             
@@ -299,16 +347,59 @@ def show_risk_calculator():
             # Additional information
             st.markdown("### Trade Details")
             trade_details = pd.DataFrame({
-                "Parameter": ["Entry Price", "Stop Loss", "Pips at Risk", "Take Profit"],
+                "Parameter": ["Entry Price", "Stop Loss", "Pips at Risk", "Pip Value (1 lot)", "Take Profit"],
                 "Value": [
                     f"{entry_price:.4f}",
                     f"{stop_loss:.4f}",
-                    f"{position_size_result['pips_at_risk']:.4f}",
+                    f"{position_size_result['pips_at_risk']:.1f}",
+                    f"{position_size_result['pip_value']:.2f} {account_currency}",
                     f"{take_profit:.4f}" if take_profit > 0 else "Not set"
                 ]
             })
             st.dataframe(trade_details, use_container_width=True, hide_index=True)
             
+            # Portfolio risk of the open positions
+            if cap_to_portfolio and not open_positions.empty:
+                st.markdown("### Portfolio Risk")
+                
+                risk_col1, risk_col2, risk_col3 = st.columns(3)
+                
+                with risk_col1:
+                    st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                    st.markdown(f"<div class='metric-value'>{risk['total_risk_pct']:.2f}%</div>", unsafe_allow_html=True)
+                    st.markdown("<div class='metric-label'>Open Risk at Stops</div>", unsafe_allow_html=True)
+                    st.markdown("</div>", unsafe_allow_html=True)
+                
+                with risk_col2:
+                    st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                    st.markdown(f"<div class='metric-value'>{risk['correlated_risk_pct']:.2f}%</div>", unsafe_allow_html=True)
+                    st.markdown("<div class='metric-label'>Correlated Risk</div>", unsafe_allow_html=True)
+                    st.markdown("</div>", unsafe_allow_html=True)
+                
+                with risk_col3:
+                    st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                    if risk['correlation'] is not None:
+                        st.markdown(f"<div class='metric-value'>{risk['var_pct']:.2f}%</div>", unsafe_allow_html=True)
+                    else:
+                        st.markdown("<div class='metric-value'>N/A</div>", unsafe_allow_html=True)
+                    st.markdown("<div class='metric-label'>VaR (95%, 1 bar)</div>", unsafe_allow_html=True)
+                    st.markdown("</div>", unsafe_allow_html=True)
+                
+                if risk['missing_history']:
+                    st.caption(f"No OHLC history for {', '.join(risk['missing_history'])}; "
+                               "their full stop losses are counted in the VaR and assumed to add up with everything else.")
+                
+                exposure_df = risk['exposure'].rename_axis("Currency").reset_index(name="Net Exposure")
+                fig = px.bar(exposure_df, x="Currency", y="Net Exposure", title=f"Net Exposure per Currency ({account_currency})")
+                fig.update_layout(
+                    height=350,
+                    margin=dict(l=20, r=20, t=40, b=20),
+                    paper_bgcolor=CHART_BG,
+                    plot_bgcolor=CHART_BG,
+                    font=dict(color=TEXT_COLOR)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
             # Visualization of risk to reward ratio if take profit is provided
             if rr_ratio:
                 fig = go.Figure()
@@ -373,7 +464,12 @@ def show_risk_calculator():
 def show_trade_journal():
     st.markdown("<h2 class='section-header'>Manual Trade Journal</h2>", unsafe_allow_html=True)
     
-    tab1, tab2 = st.tabs(["Add Trade", "Trade History"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Add Trade", "Trade History", "Backtest", "Export"])
+    
+    # Alert thresholds for the rolling metrics, configured in Trade History
+    trade_journal.rolling.thresholds = st.session_state.get(
+        'rolling_thresholds', {"winrate": 40.0, "avg_r": 0.0}
+    )
     
     with tab1:
         st.subheader("Add New Trade")
@@ -389,7 +485,7 @@ def show_trade_journal():
         with col2:
             position_size = st.number_input("Position Size (lots)", min_value=0.01, value=0.1, step=0.01)
             result_pips = st.number_input("Result (pips)", value=0.0, step=1.0)
-            trade_status = st.selectbox("Outcome", options=["Win", "Loss"])
+            trade_status = st.selectbox("Outcome", options=["Win", "Loss", "Open"])
             notes = st.text_area("Notes", height=100)
         
         # Calculate RR if take profit is set
@@ -403,7 +499,7 @@ def show_trade_journal():
                 "stop_loss": stop_loss,
                 "take_profit": take_profit,
                 "position_size": position_size,
-                "result": result_pips,
+                "result": result_pips if trade_status != "Open" else None,
                 "status": trade_status,
                 "rr": rr if rr else 0,
                 "notes": notes
@@ -412,6 +508,12 @@ def show_trade_journal():
             # Add to journal
             if trade_journal.add_trade(trade_data):
                 st.success("Trade added to journal successfully!")
+                for alert in trade_journal.rolling.pop_alerts():
+                    label = {"winrate": "Win rate", "avg_r": "Expectancy (R)", "avg_pnl": "Average P/L"}[alert['metric']]
+                    st.warning(
+                        f"{label} over the last {alert['window']} trades moved {alert['direction']} "
+                        f"{alert['threshold']:g}: now {alert['value']:.2f}"
+                    )
             else:
                 st.error("Failed to add trade to journal.")
     
@@ -425,6 +527,20 @@ def show_trade_journal():
             # Calculate statistics
             stats = calculate_trade_statistics(trades_df)
             
+            # Bootstrap confidence intervals are only computed on request and kept until the journal changes
+            version = trade_journal.get_version()
+            if st.button("Compute Confidence Intervals"):
+                st.session_state['bootstrap'] = (version, bootstrap_trade_statistics(trades_df, version=version))
+            cached_version, intervals = st.session_state.get('bootstrap', (None, None))
+            if cached_version != version:
+                intervals = None
+            
+            def interval_label(metric, fmt):
+                if not intervals:
+                    return ""
+                ci = intervals[metric]
+                return f"<div class='metric-label'>95% CI: {ci['lower']:{fmt}} – {ci['upper']:{fmt}}</div>"
+            
             # Display summary metrics
             metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
             
@@ -432,12 +548,14 @@ def show_trade_journal():
                 st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
                 st.markdown(f"<div class='metric-value'>{stats['winrate']:.1f}%</div>", unsafe_allow_html=True)
                 st.markdown("<div class='metric-label'>Win Rate</div>", unsafe_allow_html=True)
+                st.markdown(interval_label('winrate', '.1f'), unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
             
             with metrics_col2:
                 st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
                 st.markdown(f"<div class='metric-value'>{stats['avg_rr']:.2f}</div>", unsafe_allow_html=True)
                 st.markdown("<div class='metric-label'>Avg R:R Ratio</div>", unsafe_allow_html=True)
+                st.markdown(interval_label('avg_rr', '.2f'), unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
             
             with metrics_col3:
@@ -445,8 +563,26 @@ def show_trade_journal():
                 value_class = "win" if stats['total_pnl'] >= 0 else "loss"
                 st.markdown(f"<div class='metric-value {value_class}'>{stats['total_pnl']:.1f} pips</div>", unsafe_allow_html=True)
                 st.markdown("<div class='metric-label'>Total P/L</div>", unsafe_allow_html=True)
+                st.markdown(interval_label('total_pnl', '.1f'), unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
             
+            if intervals:
+                with st.expander("Confidence Intervals (95%, bootstrap)"):
+                    ci_df = pd.DataFrame([
+                        {"Metric": label, "Estimate": intervals[key]['estimate'],
+                         "Lower": intervals[key]['lower'], "Upper": intervals[key]['upper']}
+                        for key, label in [
+                            ('winrate', "Win Rate (%)"),
+                            ('avg_rr', "Avg R:R Ratio"),
+                            ('expectancy', "Expectancy (R)"),
+                            ('profit_factor', "Profit Factor"),
+                            ('total_pnl', "Total P/L (pips)")
+                        ]
+                    ])
+                    st.dataframe(ci_df, use_container_width=True, hide_index=True)
+                    st.caption("Narrow intervals mean the number is well supported by your journal; "
+                               "wide intervals mean it is still mostly noise.")
+            
             # Win/Loss chart
             if stats['win_count'] > 0 or stats['loss_count'] > 0:
                 fig = px.pie(
@@ -468,30 +604,141 @@ def show_trade_journal():
             # Display trade history
             st.markdown("### Trade Records")
             
-            # Format the dataframe for display
-            display_df = trades_df.copy()
+            # Reorder columns for better display (selecting them is the only copy made)
+            columns_order = [
+                'trade_id', 'date', 'pair', 'entry_price', 'stop_loss', 'take_profit', 
+                'position_size', 'result', 'status', 'rr', 'notes'
+            ]
+            display_df = trades_df[[col for col in columns_order if col in trades_df.columns]]
             
             # Convert date column to datetime if it's not
             if 'date' in display_df.columns:
-                display_df['date'] = pd.to_datetime(display_df['date'])
-                display_df['date'] = display_df['date'].dt.strftime("%Y-%m-%d %H:%M")
+                display_df = display_df.assign(
+                    date=pd.to_datetime(display_df['date'], format="mixed", errors="coerce").dt.strftime("%Y-%m-%d %H:%M")
+                )
             
-            # Format numeric columns
-            for col in ['entry_price', 'stop_loss', 'take_profit']:
-                if col in display_df.columns:
-                    display_df[col] = display_df[col].map(lambda x: f"{x:.4f}" if pd.notnull(x) else "")
+            # Editable table; edits are applied per trade instead of rewriting the journal
+            st.data_editor(
+                display_df,
+                key="trade_editor",
+                use_container_width=True,
+                hide_index=True,
+                num_rows="dynamic",
+                disabled=["trade_id"],
+                column_config={
+                    "trade_id": st.column_config.TextColumn("ID"),
+                    "entry_price": st.column_config.NumberColumn(format="%.4f"),
+                    "stop_loss": st.column_config.NumberColumn(format="%.4f"),
+                    "take_profit": st.column_config.NumberColumn(format="%.4f"),
+                    "rr": st.column_config.NumberColumn(format="%.2f"),
+                    "status": st.column_config.SelectboxColumn(options=["Win", "Loss", "Open"]),
+                }
+            )
             
-            if 'rr' in display_df.columns:
-                display_df['rr'] = display_df['rr'].map(lambda x: f"{x:.2f}" if pd.notnull(x) else "")
+            edits = st.session_state.get("trade_editor", {})
+            has_edits = bool(edits.get("edited_rows") or edits.get("added_rows") or edits.get("deleted_rows"))
             
-            # Reorder columns for better display
-            columns_order = [
-                'date', 'pair', 'entry_price', 'stop_loss', 'take_profit', 
-                'position_size', 'result', 'status', 'rr', 'notes'
-            ]
-            display_df = display_df[[col for col in columns_order if col in display_df.columns]]
+            if st.button("Save Changes", disabled=not has_edits):
+                trade_ids = display_df['trade_id'].tolist()
+                success = True
+                
+                for row, fields in edits.get("edited_rows", {}).items():
+                    success &= trade_journal.update_trade(trade_ids[int(row)], fields)
+                
+                for row in edits.get("deleted_rows", []):
+                    success &= trade_journal.delete_trade(trade_ids[int(row)])
+                
+                for new_trade in edits.get("added_rows", []):
+                    success &= trade_journal.add_trade(dict(new_trade))
+                
+                if success:
+                    st.success("Changes saved successfully!")
+                    st.rerun()
+                else:
+                    st.error("Failed to save some changes.")
+            
+            # Rolling performance over the last N trades
+            st.markdown("### Rolling Performance")
+            
+            window = st.selectbox("Window (trades)", options=list(DEFAULT_WINDOWS), index=0)
+            rolling = trade_journal.rolling.snapshot()[window]
+            
+            roll_col1, roll_col2, roll_col3 = st.columns(3)
+            
+            with roll_col1:
+                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-value'>{rolling['winrate']:.1f}%</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-label'>Win Rate (last {rolling['count']})</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
             
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
+            with roll_col2:
+                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                value_class = "win" if rolling['avg_pnl'] >= 0 else "loss"
+                st.markdown(f"<div class='metric-value {value_class}'>{rolling['avg_pnl']:.1f} pips</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-label'>Avg P/L per Trade (last {rolling['count']})</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+            
+            with roll_col3:
+                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+                value_class = "win" if rolling['avg_r'] >= 0 else "loss"
+                st.markdown(f"<div class='metric-value {value_class}'>{rolling['avg_r']:.2f}R</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='metric-label'>Expectancy (R, last {rolling['count']})</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+            
+            history = rolling_metrics_history(trades_df, DEFAULT_WINDOWS)
+            if not history.empty:
+                fig = px.line(
+                    history,
+                    x="trade_number",
+                    y=[f"winrate_{w}" for w in DEFAULT_WINDOWS],
+                    title="Rolling Win Rate (%)",
+                    labels={"trade_number": "Trade #", "value": "Win Rate (%)", "variable": "Window"}
+                )
+                fig.add_hline(y=trade_journal.rolling.thresholds.get("winrate", 0), line_dash="dash", line_color=LOSS_COLOR)
+                fig.update_layout(
+                    height=350,
+                    margin=dict(l=20, r=20, t=40, b=20),
+                    paper_bgcolor=CHART_BG,
+                    plot_bgcolor=CHART_BG,
+                    font=dict(color=TEXT_COLOR)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with st.expander("Alert Thresholds"):
+                thresholds = dict(trade_journal.rolling.thresholds)
+                thresholds["winrate"] = st.number_input("Alert when rolling win rate crosses (%)", value=float(thresholds.get("winrate", 40.0)), step=1.0)
+                thresholds["avg_r"] = st.number_input("Alert when rolling expectancy (R) crosses", value=float(thresholds.get("avg_r", 0.0)), step=0.1)
+                st.session_state['rolling_thresholds'] = thresholds
+            
+            # Open positions with live unrealized P/L from a price replay
+            if stats['open_count'] > 0:
+                st.markdown("### Open Positions")
+                
+                tick_file = st.text_input("Tick file (timestamp,pair,price)", value=os.path.join(trade_journal.data_path, "ticks.csv"))
+                
+                if st.button("Replay Ticks"):
+                    if os.path.exists(tick_file):
+                        tracker = OpenTradeTracker(trade_journal)
+                        closed = tracker.run(file_tick_source(tick_file))
+                        # Closing trades changes the journal, so tag the prices with the version after the replay
+                        st.session_state['open_positions'] = (trade_journal.get_version(),
+                                                              tracker.get_open_positions())
+                        if closed:
+                            st.success(f"{len(closed)} trade(s) hit stop loss or take profit and were closed.")
+                    else:
+                        st.error(f"Tick file not found: {tick_file}")
+                
+                # Replayed prices are only shown until the journal changes
+                positions_version, open_positions = st.session_state.get('open_positions', (None, None))
+                if positions_version != trade_journal.get_version():
+                    open_positions = trade_journal.get_open_trades()
+                st.dataframe(
+                    open_positions[[col for col in ['trade_id', 'pair', 'entry_price', 'stop_loss', 'take_profit',
+                                                    'position_size', 'last_price', 'unrealized_pnl']
+                                    if col in open_positions.columns]],
+                    use_container_width=True,
+                    hide_index=True
+                )
             
             # Add option to clear journal
             if st.button("Clear Journal", type="secondary"):
@@ -502,6 +749,115 @@ def show_trade_journal():
                     st.error("Failed to clear journal.")
         else:
             st.info("No trades in the journal yet. Add some trades to see them here.")
+    
+    with tab3:
+        st.subheader("Backtest Setups")
+        st.write("Replay your journaled setups against OHLC history with different stops and targets.")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            ohlc_dir = st.text_input("OHLC directory (one <PAIR>.npy file per pair)", value=os.path.join(trade_journal.data_path, "ohlc"))
+            stop_mults = st.multiselect("Stop multipliers", options=[0.5, 0.75, 1.0, 1.25, 1.5, 2.0], default=[1.0, 1.5])
+        
+        with col2:
+            target_mults = st.multiselect("Target multipliers", options=[0.5, 1.0, 1.5, 2.0, 3.0], default=[1.0])
+        
+        trades_df = trade_journal.get_trades()
+        
+        if st.button("Run Backtest", use_container_width=True):
+            if trades_df.empty:
+                st.info("No trades in the journal yet. Add some trades to backtest them.")
+            elif not os.path.isdir(ohlc_dir):
+                st.error(f"OHLC directory not found: {ohlc_dir}")
+            else:
+                variants = [
+                    {"name": f"Stop x{sm} / Target x{tm}", "stop_mult": sm, "target_mult": tm}
+                    for sm in stop_mults for tm in target_mults
+                ]
+                results = backtest_trades(trades_df, ohlc_dir, variants or None)
+                
+                if results.empty:
+                    st.warning("No trades could be matched to OHLC history.")
+                else:
+                    summary = summarize_backtest(results)
+                    st.markdown("### Variant Comparison")
+                    st.dataframe(summary, use_container_width=True, hide_index=True)
+                    
+                    fig = px.bar(
+                        summary,
+                        x="variant",
+                        y="expectancy_r",
+                        color="expectancy_r",
+                        color_continuous_scale=["#e74c3c", "#f39c12", "#2ecc71"],
+                        title="Expectancy per Variant (R)"
+                    )
+                    fig.update_layout(
+                        margin=dict(l=20, r=20, t=40, b=20),
+                        paper_bgcolor=CHART_BG,
+                        plot_bgcolor=CHART_BG,
+                        font=dict(color=TEXT_COLOR)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                    
+                    with st.expander("Per-Trade Results"):
+                        st.dataframe(results, use_container_width=True, hide_index=True)
+
+    with tab4:
+        st.subheader("Export Data")
+        
+        trades_df = trade_journal.get_trades()
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            report = st.selectbox(
+                "Report", options=REPORTS,
+                format_func=lambda r: r.replace("_", " ").title()
+            )
+            export_format = st.selectbox("Format", options=list(EXPORT_FORMATS), format_func=str.upper)
+            columns = st.multiselect("Columns", options=JOURNAL_COLUMNS, default=JOURNAL_COLUMNS,
+                                     disabled=report != "trades")
+        
+        with col2:
+            pairs = st.multiselect("Pairs", options=sorted(trades_df['pair'].dropna().unique()))
+            statuses = st.multiselect("Status", options=["Win", "Loss", "Open"])
+            date_range = st.date_input("Date range", value=())
+        
+        if st.button("Prepare Export", use_container_width=True):
+            filters = {"pairs": pairs, "statuses": statuses}
+            if len(date_range) == 2:
+                filters["date_from"] = date_range[0]
+                filters["date_to"] = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) - pd.Timedelta(minutes=1)
+            
+            extension, mime = EXPORT_FORMATS[export_format]
+            file_name = f"export_{report}{extension}"
+            # Each request gets its own file so concurrent sessions don't overwrite each other's exports
+            fd, export_path = tempfile.mkstemp(prefix=f"export_{report}_", suffix=extension,
+                                               dir=trade_journal.data_path)
+            os.close(fd)
+            try:
+                rows = export_journal(trade_journal, export_format, export_path, report, filters, columns)
+            except ImportError as e:
+                os.remove(export_path)
+                st.error(str(e))
+            except Exception as e:
+                os.remove(export_path)
+                st.error(f"Export failed: {e}")
+            else:
+                st.success(f"{rows} row(s) exported.")
+                size = os.path.getsize(export_path)
+                if size > MAX_DOWNLOAD_BYTES:
+                    # A download button would hold the whole file in memory
+                    st.info(f"The export is {size / 1024 ** 2:.0f} MB and was saved to {os.path.abspath(export_path)}.")
+                else:
+                    with open(export_path, "rb") as f:
+                        data = f.read()
+                    os.remove(export_path)
+                    st.download_button(
+                        "Download", data=data, file_name=file_name,
+                        mime=mime, use_container_width=True
+                    )
 
 # Function to display Expected Profit Projection
 def show_profit_projection():
@@ -530,14 +886,56 @@ def show_profit_projection():
                 avg_rr = stats['avg_rr']
                 winrate = stats['winrate']
         
+        # Simulated management replaces the all-or-nothing win/loss outcome
+        simulate = st.checkbox("Simulate Trade Management",
+                               help="Replay price paths with partial closes, breakeven and trailing stops")
+        if simulate:
+            with st.expander("Management Rules", expanded=True):
+                target_r = st.number_input("Take Profit (R, 0 = none)", min_value=0.0, value=float(round(avg_rr, 2)), step=0.1)
+                partial_pct = st.slider("Partial Close (%)", min_value=0, max_value=100, value=50, step=5)
+                partial_r = st.number_input("Partial Close at (R)", min_value=0.1, value=1.0, step=0.1)
+                breakeven_r = st.number_input("Move Stop to Breakeven at (R, 0 = off)", min_value=0.0, value=1.0, step=0.1)
+                stop_pips = st.number_input("Stop Distance (pips)", min_value=1.0, value=20.0, step=1.0)
+                trail_pips = st.number_input("Trailing Stop (pips, 0 = off)", min_value=0.0, value=0.0, step=1.0)
+                trail_start_r = st.number_input("Start Trailing at (R)", min_value=0.0, value=1.0, step=0.1)
+                
+                ohlc_dir = os.path.join(trade_journal.data_path, "ohlc")
+                ohlc_pairs = sorted(f[:-4] for f in os.listdir(ohlc_dir) if f.endswith(".npy")) \
+                    if os.path.isdir(ohlc_dir) else []
+                path_source = st.selectbox("Price Paths", ["Synthetic random walk"] + (["OHLC history"] if ohlc_pairs else []))
+                ohlc_pair = st.selectbox("Pair", ohlc_pairs) if path_source == "OHLC history" else None
+                n_paths = st.select_slider("Simulated Trades", options=[1000, 5000, 10000, 20000], value=5000)
+        
         calculate_button = st.button("Calculate Projection", use_container_width=True)
     
     with col2:
         st.subheader("Projection Results")
         
         if calculate_button:
-            # Calculate expected value
-            ev_results = calculate_expected_value(avg_rr, winrate, risk_per_trade)
+            sim_results = None
+            if simulate:
+                rules = [
+                    {"name": "Fixed", "target_r": avg_rr},
+                    {"name": "Managed", "target_r": target_r or None, "partial_r": partial_r,
+                     "partial_pct": partial_pct, "breakeven_r": breakeven_r or None,
+                     "trail_r": trail_pips / stop_pips, "trail_start_r": trail_start_r}
+                ]
+                try:
+                    if path_source == "OHLC history":
+                        source = ohlc_source(ohlc_dir, ohlc_pair, stop_pips * pip_size(ohlc_pair))
+                    else:
+                        # Drift calibrated so the fixed stop and target wins at the given win rate
+                        source = random_walk_source(calibrate_drift(winrate, avg_rr, DEFAULT_VOLATILITY))
+                    sim_results = simulate_management(source, rules, n_paths=n_paths, seed=0)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
+                
+                managed_r = sim_results.loc[sim_results['rule'] == "Managed", 'r_multiple'].to_numpy()
+                ev_results = calculate_distribution_expected_value(managed_r, risk_per_trade, seed=0)
+            else:
+                # Calculate expected value
+                ev_results = calculate_expected_value(avg_rr, winrate, risk_per_trade)
             
             # Display expected value per trade
             ev_per_trade = ev_results['expected_value_per_trade']
@@ -583,6 +981,45 @@ def show_profit_projection():
             
             st.plotly_chart(fig, use_container_width=True)
             
+            if sim_results is not None:
+                ranges = ev_results['projection_ranges']
+                st.caption("90% range: " + ", ".join(
+                    f"{n} trades {low:.2f}% to {high:.2f}%" for n, (low, high) in ranges.items()
+                ))
+                
+                st.markdown("### Trade Management")
+                summary = summarize_management(sim_results)
+                st.dataframe(
+                    summary.rename(columns={
+                        'rule': 'Rule', 'expectancy_r': 'Expectancy (R)', 'winrate': 'Win Rate (%)',
+                        'avg_win_r': 'Avg Win (R)', 'avg_loss_r': 'Avg Loss (R)', 'p5_r': '5th Pct (R)',
+                        'median_r': 'Median (R)', 'p95_r': '95th Pct (R)', 'stop_pct': 'Stopped (%)',
+                        'breakeven_pct': 'Breakeven (%)', 'trail_pct': 'Trailed (%)',
+                        'target_pct': 'Target (%)', 'time_pct': 'Timed Out (%)'
+                    }).round(2),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                
+                fig = px.histogram(
+                    sim_results, x="r_multiple", color="rule", barmode="overlay", nbins=60,
+                    labels={"r_multiple": "Effective R", "rule": "Rule"},
+                    color_discrete_sequence=["#95a5a6", "#3498db"]
+                )
+                fig.update_layout(
+                    height=350,
+                    margin=dict(l=20, r=20, t=40, b=20),
+                    paper_bgcolor=CHART_BG,
+                    plot_bgcolor=CHART_BG,
+                    font=dict(color=TEXT_COLOR)
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.caption(
+                    "Fixed rides the whole position to the stop or the average R:R target; Managed applies your rules. "
+                    "The projection above uses the Managed distribution."
+                )
+            
             # Interpretation
             st.markdown("### Interpretation")
             
@@ -0,0 +1,317 @@
+import numpy as np
+import pandas as pd
+
+from backtest import load_ohlc
+
+
+# Upper bound on the number of (path, bar) elements simulated per batch
+CHUNK_ELEMENTS = 1_000_000
+
+# Standard deviation of a synthetic bar's move in R; about 100 bars to travel 1R
+DEFAULT_VOLATILITY = 0.1
+
+# Rules applied when none are given: the whole position rides to a 2R target or the stop
+DEFAULT_RULES = [{"name": "Fixed", "target_r": 2.0}]
+
+EXIT_REASONS = ["stop", "breakeven", "trail", "target", "time"]
+
+
+def calibrate_drift(winrate, target_r, volatility):
+    """
+    Get the per-bar drift at which a random walk reaches +target_r before -1R at a given rate.
+
+    Uses the hitting probability of Brownian motion with drift, so a plain
+    stop-and-target trade on the simulated paths wins as often as the journal.
+
+    Parameters:
+    -----------
+    winrate : float
+        Win rate as a percentage
+    target_r : float
+        Take profit distance in R
+    volatility : float
+        Standard deviation of the per-bar move in R
+
+    Returns:
+    --------
+    float
+        Drift per bar in R
+    """
+    p = min(max(winrate / 100, 0.001), 0.999)
+
+    def hit_probability(nu):
+        # P(hit +b before -1) for drift/variance ratio nu / 2
+        if abs(nu) < 1e-9:
+            return 1 / (1 + target_r)
+        return -np.expm1(nu) / (np.exp(-nu * target_r) - np.exp(nu))
+
+    bound = 700 / max(1.0, target_r)
+    low, high = -bound, bound
+    for _ in range(200):
+        mid = (low + high) / 2
+        if hit_probability(mid) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2 * volatility ** 2 / 2
+
+
+def random_walk_source(drift=0.0, volatility=DEFAULT_VOLATILITY):
+    """
+    Create a source of synthetic price paths in R units.
+
+    Closes follow a Gaussian random walk from the entry at 0; each bar's high
+    and low are drawn from the extremes of a Brownian bridge between its open
+    and close.
+
+    Parameters:
+    -----------
+    drift : float
+        Mean move per bar in R, e.g. from `calibrate_drift`
+    volatility : float
+        Standard deviation of the move per bar in R
+
+    Returns:
+    --------
+    callable
+        Function (n_paths, n_bars, rng) returning open, high, low and close
+        arrays shaped (n_paths, n_bars)
+    """
+    def source(n_paths, n_bars, rng):
+        steps = rng.normal(drift, volatility, (n_paths, n_bars))
+        close = np.cumsum(steps, axis=1)
+        open_ = close - steps
+        mid = (open_ + close) / 2
+        spread = steps ** 2
+        var = volatility ** 2
+        high = mid + np.sqrt(spread - 2 * var * np.log(1 - rng.random((n_paths, n_bars)))) / 2
+        low = mid - np.sqrt(spread - 2 * var * np.log(1 - rng.random((n_paths, n_bars)))) / 2
+        return open_, high, low, close
+
+    return source
+
+
+def ohlc_source(ohlc_dir, pair, stop_distance):
+    """
+    Create a source of price paths replayed from OHLC history.
+
+    Each path enters at the open of a random bar in a random direction, and
+    prices are expressed in R as multiples of `stop_distance` in the trade's
+    favor.
+
+    Parameters:
+    -----------
+    ohlc_dir : str
+        Directory containing the <PAIR>.npy bar files
+    pair : str
+        Pair to replay
+    stop_distance : float
+        Initial stop distance in price units
+
+    Returns:
+    --------
+    callable
+        Function (n_paths, n_bars, rng) returning open, high, low and close
+        arrays shaped (n_paths, n_bars)
+    """
+    bars = load_ohlc(ohlc_dir, pair)
+    if bars is None:
+        raise ValueError(f"No OHLC history for {pair}")
+    if stop_distance <= 0:
+        raise ValueError("Stop distance must be positive")
+
+    def source(n_paths, n_bars, rng):
+        if len(bars) <= n_bars:
+            raise ValueError(f"OHLC history for {pair} is shorter than {n_bars} bars")
+
+        start = rng.integers(0, len(bars) - n_bars, n_paths)
+        idx = start[:, None] + np.arange(n_bars)
+        entry = np.asarray(bars['open'][start])[:, None]
+        direction = np.where(rng.random(n_paths) < 0.5, 1.0, -1.0)[:, None]
+
+        def to_r(values):
+            return direction * (np.asarray(values) - entry) / stop_distance
+
+        open_, close = to_r(bars['open'][idx]), to_r(bars['close'][idx])
+        high, low = to_r(bars['high'][idx]), to_r(bars['low'][idx])
+        # For shorts the bar low is the favorable extreme
+        return open_, np.maximum(high, low), np.minimum(high, low), close
+
+    return source
+
+
+def _first(mask):
+    """
+    Get the index of the first True value per row, the row length if there is none.
+    """
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def _manage(open_, high, low, close, rule):
+    """
+    Apply one management rule to a batch of price paths.
+
+    The stop for a bar is set from the highs of the bars before it, and a bar
+    touching both the stop and a profit level is assumed to hit the stop first.
+
+    Parameters:
+    -----------
+    open_, high, low, close : np.ndarray
+        Price paths in R, shaped (paths, bars)
+    rule : dict
+        Management rule, see `simulate_management`
+
+    Returns:
+    --------
+    tuple
+        Effective R multiple and exit reason index (into EXIT_REASONS) per path
+    """
+    n_paths, n_bars = high.shape
+    rows = np.arange(n_paths)
+
+    target_r = rule.get('target_r') or np.inf
+    partial_r = rule.get('partial_r') or np.inf
+    # A partial close at or beyond the target never happens before the full exit
+    partial_frac = rule.get('partial_pct', 0) / 100 if partial_r < target_r else 0.0
+    breakeven_r = rule.get('breakeven_r') or np.inf
+    trail_r = rule.get('trail_r') or 0.0
+    trail_start_r = rule.get('trail_start_r', 0.0)
+
+    # Best price reached before each bar
+    peak = np.maximum.accumulate(high, axis=1)
+    peak = np.concatenate([np.zeros((n_paths, 1)), np.maximum(peak[:, :-1], 0)], axis=1)
+
+    stop = np.full((n_paths, n_bars), -1.0)
+    reason = np.zeros((n_paths, n_bars), dtype=np.int8)
+    if np.isfinite(breakeven_r):
+        moved = peak >= breakeven_r
+        stop = np.where(moved, 0.0, stop)
+        reason = np.where(moved, 1, reason)
+    if trail_r > 0:
+        trail = peak - trail_r
+        moved = (peak >= trail_start_r) & (trail > stop)
+        stop = np.where(moved, trail, stop)
+        reason = np.where(moved, 2, reason)
+
+    stop_bar = _first(low <= stop)
+    target_bar = _first(high >= target_r)
+    exit_bar = np.minimum(stop_bar, target_bar)
+    at = np.minimum(exit_bar, n_bars - 1)
+
+    # Gaps through a level fill at the bar open
+    bar_open = open_[rows, at]
+    bar_stop = stop[rows, at]
+    exit_r = np.where(
+        exit_bar == n_bars, close[:, -1],
+        np.where(stop_bar <= target_bar, np.minimum(bar_stop, bar_open), np.maximum(target_r, bar_open))
+    )
+    exit_reason = np.where(
+        exit_bar == n_bars, 4,
+        np.where(stop_bar <= target_bar, reason[rows, at], 3)
+    )
+
+    if partial_frac == 0:
+        return exit_r, exit_reason
+
+    partial_bar = _first(high >= partial_r)
+    took_partial = (partial_bar < exit_bar) | ((partial_bar == exit_bar) & (exit_reason == 3))
+    partial_fill = np.maximum(partial_r, open_[rows, np.minimum(partial_bar, n_bars - 1)])
+
+    r_multiple = np.where(
+        took_partial,
+        partial_frac * partial_fill + (1 - partial_frac) * exit_r,
+        exit_r
+    )
+    return r_multiple, exit_reason
+
+
+def simulate_management(source, rules=None, n_paths=10000, n_bars=1000, seed=None):
+    """
+    Simulate trade management rules over many price paths.
+
+    Paths are generated and managed in batches of whole (paths, bars)
+    arrays, and every rule is applied to the same paths so they can be
+    compared directly.
+
+    Parameters:
+    -----------
+    source : callable
+        Path source from `random_walk_source` or `ohlc_source`
+    rules : list, optional
+        Dicts with name and any of target_r (take profit in R), partial_r and
+        partial_pct (close partial_pct % of the position at partial_r),
+        breakeven_r (move the stop to entry once price reaches it), trail_r
+        (trailing stop distance in R) and trail_start_r (profit in R from
+        which the stop trails). Defaults to DEFAULT_RULES.
+    n_paths : int
+        Number of simulated trades
+    n_bars : int
+        Maximum bars a trade is held; trades still open are closed at market
+    seed : int, optional
+        Seed for reproducible paths
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per rule and path with rule, r_multiple and exit reason
+    """
+    rules = rules or DEFAULT_RULES
+    rng = np.random.default_rng(seed)
+    batch = max(1, CHUNK_ELEMENTS // max(1, n_bars))
+
+    r_multiples = {rule['name']: [] for rule in rules}
+    reasons = {rule['name']: [] for rule in rules}
+    for start in range(0, n_paths, batch):
+        paths = source(min(batch, n_paths - start), n_bars, rng)
+        for rule in rules:
+            r_multiple, exit_reason = _manage(*paths, rule)
+            r_multiples[rule['name']].append(r_multiple)
+            reasons[rule['name']].append(exit_reason)
+
+    frames = []
+    for rule in rules:
+        r_multiple = np.concatenate(r_multiples[rule['name']])
+        exit_reason = np.concatenate(reasons[rule['name']])
+        frames.append(pd.DataFrame({
+            'rule': rule['name'],
+            'r_multiple': r_multiple,
+            'exit': np.array(EXIT_REASONS)[exit_reason]
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize_management(results_df):
+    """
+    Summarize the effective R distribution of each management rule.
+
+    Parameters:
+    -----------
+    results_df : pd.DataFrame
+        Results from `simulate_management`
+
+    Returns:
+    --------
+    pd.DataFrame
+        Per rule: expectancy (mean R), winrate, average win and loss in R,
+        5th/50th/95th percentile R and the share of each exit reason
+    """
+    rows = []
+    for rule, group in results_df.groupby('rule', sort=False):
+        r = group['r_multiple'].to_numpy()
+        wins = r[r > 0]
+        losses = r[r <= 0]
+        row = {
+            'rule': rule,
+            'expectancy_r': r.mean(),
+            'winrate': len(wins) / len(r) * 100,
+            'avg_win_r': wins.mean() if len(wins) else 0.0,
+            'avg_loss_r': losses.mean() if len(losses) else 0.0,
+            'p5_r': np.percentile(r, 5),
+            'median_r': np.percentile(r, 50),
+            'p95_r': np.percentile(r, 95)
+        }
+        shares = group['exit'].value_counts(normalize=True)
+        for reason in EXIT_REASONS:
+            row[f'{reason}_pct'] = shares.get(reason, 0.0) * 100
+        rows.append(row)
+    return pd.DataFrame(rows)
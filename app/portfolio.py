@@ -0,0 +1,336 @@
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from instruments import CrossRateTable, get_instrument
+from backtest import load_ohlc
+
+
+# Memoized return statistics keyed by OHLC directory, symbols, lookback and file versions
+_RETURN_STATS_CACHE = {}
+_CACHE_SIZE = 16
+
+
+def build_positions(trades_df, account_currency="USD", rate_table=None):
+    """
+    Convert open or planned trades into positions valued in the account currency.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        Trades with pair, entry_price, stop_loss and position_size (lots) columns
+    account_currency : str
+        Currency of the trading account
+    rate_table : CrossRateTable, optional
+        Conversion rates from quote currencies to the account currency
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per position with symbol, base and quote currency, direction,
+        lots, signed notional and signed stop risk (loss at the stop), both in
+        the account currency. Positions that can't be valued are dropped.
+    """
+    rate_table = rate_table or CrossRateTable(None)
+
+    entry = pd.to_numeric(trades_df['entry_price'], errors='coerce').to_numpy(dtype=float)
+    stop = pd.to_numeric(trades_df['stop_loss'], errors='coerce').to_numpy(dtype=float)
+    lots = pd.to_numeric(trades_df['position_size'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    # One registry and conversion lookup per instrument
+    specs = {}
+    for pair, price in zip(trades_df['pair'], entry):
+        if pair in specs:
+            continue
+        try:
+            instrument = get_instrument(pair)
+            pip_value = rate_table.pip_value(pair, account_currency, price=price)
+        except ValueError:
+            specs[pair] = None
+            continue
+        specs[pair] = (instrument, pip_value)
+
+    valid = np.array([specs[pair] is not None for pair in trades_df['pair']], dtype=bool)
+    valid &= ~np.isnan(entry) & ~np.isnan(stop)
+    if not valid.any():
+        return pd.DataFrame(columns=[
+            'symbol', 'base', 'quote', 'direction', 'lots', 'notional', 'stop_risk'
+        ])
+
+    pairs = trades_df['pair'].to_numpy()[valid]
+    instruments = [specs[pair][0] for pair in pairs]
+    pip_size = np.array([i.pip_size for i in instruments])
+    pip_value = np.array([specs[pair][1] for pair in pairs])
+    entry, stop, lots = entry[valid], stop[valid], lots[valid]
+
+    direction = np.where(stop < entry, 1.0, -1.0)
+    # Account-currency value of one price unit per lot is pip_value / pip_size
+    notional = direction * lots * entry * pip_value / pip_size
+    stop_risk = direction * lots * np.abs(entry - stop) / pip_size * pip_value
+
+    return pd.DataFrame({
+        'symbol': [i.symbol for i in instruments],
+        'base': [i.base_currency or i.symbol for i in instruments],
+        'quote': [i.quote_currency for i in instruments],
+        'direction': direction,
+        'lots': lots,
+        'notional': notional,
+        'stop_risk': stop_risk
+    })
+
+
+def currency_exposure(positions):
+    """
+    Net the exposure of all positions per currency.
+
+    A long position is long its base currency (or the instrument itself for
+    indices) and short its quote currency by the same notional.
+
+    Parameters:
+    -----------
+    positions : pd.DataFrame
+        Positions from `build_positions`
+
+    Returns:
+    --------
+    pd.Series
+        Net exposure per currency in the account currency
+    """
+    exposure = pd.concat([
+        pd.Series(positions['notional'].to_numpy(), index=positions['base']),
+        pd.Series(-positions['notional'].to_numpy(), index=positions['quote'])
+    ])
+    return exposure.groupby(level=0).sum().sort_values(key=np.abs, ascending=False)
+
+
+def get_return_stats(ohlc_dir, symbols, lookback=500):
+    """
+    Get per-bar return volatility and correlation of instruments from OHLC history.
+
+    Results are cached until one of the bar files changes.
+
+    Parameters:
+    -----------
+    ohlc_dir : str
+        Directory containing the <PAIR>.npy bar files
+    symbols : list
+        Normalized instrument names
+    lookback : int
+        Number of most recent bars used per instrument
+
+    Returns:
+    --------
+    tuple
+        Volatility per symbol (pd.Series) and correlation matrix (pd.DataFrame).
+        Symbols without history are left out of both.
+    """
+    symbols = sorted(set(symbols))
+    versions = []
+    for symbol in symbols:
+        try:
+            versions.append(os.stat(os.path.join(ohlc_dir, f"{symbol}.npy")).st_mtime_ns)
+        except (OSError, TypeError):
+            versions.append(None)
+
+    key = (ohlc_dir, tuple(symbols), lookback, tuple(versions))
+    if key in _RETURN_STATS_CACHE:
+        return _RETURN_STATS_CACHE[key]
+
+    closes = {}
+    for symbol, version in zip(symbols, versions):
+        if version is None:
+            continue
+        bars = load_ohlc(ohlc_dir, symbol)
+        if bars is None or len(bars) < 2:
+            continue
+        recent = bars[-(lookback + 1):]
+        closes[symbol] = pd.Series(np.asarray(recent['close']), index=np.asarray(recent['time']))
+
+    returns = pd.DataFrame(closes).sort_index().ffill().pct_change().iloc[1:]
+    volatility = returns.std()
+    correlation = returns.corr()
+
+    if len(_RETURN_STATS_CACHE) >= _CACHE_SIZE:
+        _RETURN_STATS_CACHE.pop(next(iter(_RETURN_STATS_CACHE)))
+    _RETURN_STATS_CACHE[key] = (volatility, correlation)
+    return volatility, correlation
+
+
+def _position_correlation(positions, correlation):
+    """
+    Expand an instrument correlation matrix to one row and column per position.
+
+    Pairs of positions without a known correlation are treated as the worst
+    case, where their losses add up fully regardless of direction.
+
+    Parameters:
+    -----------
+    positions : pd.DataFrame
+        Positions from `build_positions`
+    correlation : pd.DataFrame or None
+        Instrument correlation matrix; None treats every pair as unknown
+
+    Returns:
+    --------
+    np.ndarray
+        Position correlation matrix
+    """
+    direction = positions['direction'].to_numpy(dtype=float)
+    matrix = np.outer(direction, direction)
+    if correlation is not None:
+        idx = correlation.index.get_indexer(positions['symbol'])
+        known = idx >= 0
+        known_corr = correlation.to_numpy()[np.ix_(idx[known], idx[known])]
+        matrix[np.ix_(known, known)] = np.where(np.isnan(known_corr), matrix[np.ix_(known, known)], known_corr)
+    np.fill_diagonal(matrix, 1.0)
+    return matrix
+
+
+def portfolio_risk(positions, account_balance, ohlc_dir=None, confidence=95, horizon=1, lookback=500):
+    """
+    Aggregate the risk of all positions.
+
+    Parameters:
+    -----------
+    positions : pd.DataFrame
+        Positions from `build_positions`
+    account_balance : float
+        Total account balance in the account currency
+    ohlc_dir : str, optional
+        Directory with OHLC history for the correlation matrix and VaR; without
+        it losses at the stops are assumed to add up and VaR is not computed.
+        Positions without history count toward VaR with their full stop risk.
+    confidence : float
+        VaR confidence level as a percentage
+    horizon : int
+        VaR horizon in bars
+    lookback : int
+        Number of bars of history used for volatility and correlation
+
+    Returns:
+    --------
+    dict
+        Total stop risk (simple sum and correlation-adjusted), parametric
+        value-at-risk, each also as a percentage of balance, the per-currency
+        exposure, the instrument correlation matrix and the symbols without history
+    """
+    if positions.empty:
+        return {
+            "total_risk": 0.0, "total_risk_pct": 0.0,
+            "correlated_risk": 0.0, "correlated_risk_pct": 0.0,
+            "var": 0.0, "var_pct": 0.0,
+            "exposure": pd.Series(dtype=float),
+            "correlation": None,
+            "missing_history": []
+        }
+
+    volatility, correlation = None, None
+    if ohlc_dir is not None:
+        volatility, correlation = get_return_stats(ohlc_dir, positions['symbol'], lookback)
+
+    stop_risk = positions['stop_risk'].to_numpy()
+    total_risk = np.abs(stop_risk).sum()
+    corr = _position_correlation(positions, correlation)
+    correlated_risk = float(np.sqrt(max(stop_risk @ corr @ stop_risk, 0)))
+
+    var = 0.0
+    missing = []
+    if volatility is not None:
+        sigma = positions['symbol'].map(volatility).to_numpy(dtype=float)
+        unknown = np.isnan(sigma)
+        missing = sorted(set(positions['symbol'][unknown]))
+        z = NormalDist().inv_cdf(confidence / 100)
+        # Without history the worst case is the loss at the stop
+        value_at_risk = np.where(unknown, stop_risk, z * np.sqrt(horizon) * positions['notional'].to_numpy() * sigma)
+        var = float(np.sqrt(max(value_at_risk @ corr @ value_at_risk, 0)))
+
+    return {
+        "total_risk": float(total_risk),
+        "total_risk_pct": float(total_risk / account_balance * 100),
+        "correlated_risk": correlated_risk,
+        "correlated_risk_pct": correlated_risk / account_balance * 100,
+        "var": var,
+        "var_pct": var / account_balance * 100,
+        "exposure": currency_exposure(positions),
+        "correlation": correlation,
+        "missing_history": missing
+    }
+
+
+def cap_position_size(new_position, positions, account_balance, risk_budget, correlation=None):
+    """
+    Get the largest size of a new position that keeps the portfolio within its risk budget.
+
+    The correlation-adjusted stop risk sqrt(r'Cr) of the portfolio with the
+    new position added is quadratic in its size, so the cap is solved in
+    closed form.
+
+    Parameters:
+    -----------
+    new_position : pd.DataFrame
+        The new position from `build_positions`, sized at 1 lot
+    positions : pd.DataFrame
+        Existing positions from `build_positions`
+    account_balance : float
+        Total account balance in the account currency
+    risk_budget : float
+        Maximum portfolio risk as a percentage of balance
+    correlation : pd.DataFrame, optional
+        Instrument correlation matrix; None assumes losses at the stops add up
+
+    Returns:
+    --------
+    float
+        Maximum lots for the new position, 0 if the budget is already used up
+    """
+    budget = account_balance * risk_budget / 100
+    combined = pd.concat([positions, new_position], ignore_index=True)
+    corr = _position_correlation(combined, correlation)
+
+    r = np.append(positions['stop_risk'].to_numpy(dtype=float), 0.0)
+    u = np.zeros(len(combined))
+    u[-1] = new_position['stop_risk'].iloc[0]
+
+    a = u @ corr @ u
+    b = u @ corr @ r
+    c = r @ corr @ r
+    discriminant = b * b - a * (c - budget * budget)
+    if a <= 0 or discriminant < 0:
+        return 0.0
+    return float(max((-b + np.sqrt(discriminant)) / a, 0.0))
+
+
+def cap_new_position(new_position, positions, account_balance, risk_budget, ohlc_dir=None, lookback=500):
+    """
+    Cap a new position against the open positions using their joint return history.
+
+    The correlation matrix covers the new instrument as well, so a position
+    hedging the open ones is not treated as adding to their risk.
+
+    Parameters:
+    -----------
+    new_position : pd.DataFrame
+        The new position from `build_positions`, sized at 1 lot
+    positions : pd.DataFrame
+        Existing positions from `build_positions`
+    account_balance : float
+        Total account balance in the account currency
+    risk_budget : float
+        Maximum portfolio risk as a percentage of balance
+    ohlc_dir : str, optional
+        Directory with OHLC history; without it losses at the stops are assumed to add up
+    lookback : int
+        Number of bars of history used for the correlation
+
+    Returns:
+    --------
+    float
+        Maximum lots for the new position, 0 if the budget is already used up
+    """
+    correlation = None
+    if ohlc_dir is not None:
+        symbols = list(positions['symbol']) + list(new_position['symbol'])
+        _, correlation = get_return_stats(ohlc_dir, symbols, lookback)
+    return cap_position_size(new_position, positions, account_balance, risk_budget, correlation)
@@ -0,0 +1,236 @@
+import csv
+import socket
+from collections import namedtuple
+
+import numpy as np
+
+from instruments import normalize_pair, pip_size
+
+
+# A single price update for a pair
+Tick = namedtuple("Tick", ["timestamp", "pair", "price"])
+
+
+def _parse_tick(fields):
+    """
+    Parse a "timestamp,pair,price" record into a Tick.
+
+    Parameters:
+    -----------
+    fields : list
+        Fields of one record
+
+    Returns:
+    --------
+    Tick or None
+        Parsed tick, None for headers and malformed records
+    """
+    if len(fields) < 3:
+        return None
+    try:
+        return Tick(fields[0].strip(), normalize_pair(fields[1]), float(fields[2]))
+    except ValueError:
+        return None
+
+
+def file_tick_source(path):
+    """
+    Replay ticks from a local CSV file with timestamp, pair and price columns.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the tick file
+
+    Yields:
+    -------
+    Tick
+        Ticks in file order
+    """
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for fields in csv.reader(f):
+            tick = _parse_tick(fields)
+            if tick is not None:
+                yield tick
+
+
+def socket_tick_source(host, port, timeout=None):
+    """
+    Read ticks from a TCP socket sending one "timestamp,pair,price" line per tick.
+
+    Parameters:
+    -----------
+    host : str
+        Host of the price server
+    port : int
+        Port of the price server
+    timeout : float, optional
+        Socket timeout in seconds
+
+    Yields:
+    -------
+    Tick
+        Ticks in arrival order until the server closes the connection
+    """
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        with conn.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                tick = _parse_tick(line.strip().split(","))
+                if tick is not None:
+                    yield tick
+
+
+class OpenTradeTracker:
+    """
+    Track unrealized P/L of open journal trades from a stream of price ticks.
+
+    Open trades are indexed per pair as NumPy arrays, so each tick only
+    touches the positions of its own pair. Trades whose stop loss or take
+    profit is touched are closed in the journal at that level.
+    """
+
+    def __init__(self, journal):
+        """
+        Initialize the tracker from the open trades of a journal.
+
+        Parameters:
+        -----------
+        journal : TradeJournal
+            Journal holding the open trades
+        """
+        self.journal = journal
+        self.last_price = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild the per-pair index of open positions from the journal.
+        """
+        self._positions = {}
+
+        open_trades = self.journal.get_open_trades()
+        for pair, trades in open_trades.groupby(open_trades['pair'].map(normalize_pair)):
+            entry = trades['entry_price'].to_numpy(dtype=float)
+            stop_loss = trades['stop_loss'].to_numpy(dtype=float)
+            take_profit = trades['take_profit'].fillna(0).to_numpy(dtype=float)
+
+            # Long if the stop is below entry, short otherwise
+            direction = np.where(stop_loss < entry, 1.0, -1.0)
+
+            self._positions[pair] = {
+                "trade_id": trades['trade_id'].to_numpy(),
+                "entry": entry,
+                "stop_loss": stop_loss,
+                "take_profit": take_profit,
+                "direction": direction,
+                "rr": trades['rr'].fillna(0).to_numpy(dtype=float),
+                "unrealized": np.zeros(len(trades))
+            }
+
+    def on_tick(self, tick):
+        """
+        Process one price tick.
+
+        Parameters:
+        -----------
+        tick : Tick
+            Price update
+
+        Returns:
+        --------
+        list
+            IDs of the trades closed by this tick
+        """
+        pair = normalize_pair(tick.pair)
+        self.last_price[pair] = tick.price
+
+        positions = self._positions.get(pair)
+        if positions is None:
+            return []
+
+        price = tick.price
+        pip = pip_size(pair)
+        direction = positions['direction']
+        pnl = direction * (price - positions['entry']) / pip
+
+        sl_hit = direction * (price - positions['stop_loss']) <= 0
+        tp_hit = (positions['take_profit'] > 0) & (direction * (price - positions['take_profit']) >= 0)
+        hit = sl_hit | tp_hit
+        positions['unrealized'][:] = pnl
+
+        if not hit.any():
+            return []
+
+        # The stop is assumed to fill first when a tick gaps through both levels
+        exit_price = np.where(sl_hit, positions['stop_loss'], positions['take_profit'])
+        result = direction * (exit_price - positions['entry']) / pip
+
+        closed = []
+        for i in np.flatnonzero(hit):
+            trade_id = positions['trade_id'][i]
+            self.journal.update_trade(trade_id, {
+                "status": "Win" if result[i] > 0 else "Loss",
+                "result": round(float(result[i]), 1),
+                "rr": float(positions['rr'][i])
+            })
+            closed.append(trade_id)
+
+        remaining = ~hit
+        if remaining.any():
+            self._positions[pair] = {k: v[remaining] for k, v in positions.items()}
+        else:
+            del self._positions[pair]
+
+        return closed
+
+    def run(self, source, max_ticks=None):
+        """
+        Consume ticks from a source until it is exhausted.
+
+        Parameters:
+        -----------
+        source : iterable
+            Any iterable of Tick, e.g. `file_tick_source` or `socket_tick_source`
+        max_ticks : int, optional
+            Stop after this many ticks
+
+        Returns:
+        --------
+        list
+            IDs of the trades closed during the run
+        """
+        closed = []
+        for n, tick in enumerate(source):
+            if max_ticks is not None and n >= max_ticks:
+                break
+            closed.extend(self.on_tick(tick))
+        return closed
+
+    def get_unrealized(self):
+        """
+        Get the unrealized P/L of every tracked open trade.
+
+        Returns:
+        --------
+        dict
+            Trade IDs mapped to unrealized P/L in pips
+        """
+        unrealized = {}
+        for positions in self._positions.values():
+            unrealized.update(zip(positions['trade_id'], positions['unrealized'].tolist()))
+        return unrealized
+
+    def get_open_positions(self):
+        """
+        Get the open trades with their current unrealized P/L.
+
+        Returns:
+        --------
+        pd.DataFrame
+            Open trades with `last_price` and `unrealized_pnl` (pips) columns
+        """
+        open_trades = self.journal.get_open_trades().copy()
+        pairs = open_trades['pair'].map(normalize_pair)
+        open_trades['last_price'] = pairs.map(self.last_price)
+        open_trades['unrealized_pnl'] = open_trades['trade_id'].map(self.get_unrealized())
+        return open_trades
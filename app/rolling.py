@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_WINDOWS = (20, 50, 100)
+
+# Metrics tracked per window; avg_r is the expectancy in R, avg_pnl the mean result in pips
+METRICS = ["winrate", "avg_pnl", "avg_r"]
+
+
+def _closed_trade_arrays(trades_df):
+    """
+    Extract win flags, R multiples and results of closed trades in journal order.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+
+    Returns:
+    --------
+    tuple
+        Win flags (1.0/0.0), R multiples and results (pips) as NumPy arrays
+    """
+    closed = trades_df[trades_df['status'].isin(['Win', 'Loss'])]
+    win = (closed['status'] == 'Win').to_numpy(dtype=float)
+    rr = pd.to_numeric(closed['rr'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    result = pd.to_numeric(closed['result'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    # A win returns its planned R:R, a loss costs the full 1R
+    r_multiple = np.where(win > 0, rr, -1.0)
+    return win, r_multiple, result
+
+
+def closed_trade_values(trades_df):
+    """
+    Stack the per-trade values tracked by the rolling windows.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+
+    Returns:
+    --------
+    np.ndarray
+        One row of win flag, R multiple and result per closed trade, in journal order
+    """
+    return np.column_stack(_closed_trade_arrays(trades_df))
+
+
+class _RingWindow:
+    """
+    Running sums over the last `size` closed trades, kept in ring buffers.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize an empty window.
+
+        Parameters:
+        -----------
+        size : int
+            Number of trades in the window
+        """
+        self.size = size
+        self.buffer = np.zeros((size, 3))
+        self.sums = np.zeros(3)
+        self.pos = 0
+        self.count = 0
+
+    def push(self, values):
+        """
+        Add one trade, dropping the oldest one once the window is full.
+
+        Parameters:
+        -----------
+        values : np.ndarray
+            Win flag, R multiple and result of the trade
+        """
+        if self.count == self.size:
+            self.sums -= self.buffer[self.pos]
+        else:
+            self.count += 1
+        self.buffer[self.pos] = values
+        self.sums += values
+        self.pos = (self.pos + 1) % self.size
+
+    def metrics(self):
+        """
+        Get the metrics of the trades currently in the window.
+
+        Returns:
+        --------
+        dict
+            Winrate (%), average result (pips per trade), average R and trade count
+        """
+        if self.count == 0:
+            return {"winrate": 0.0, "avg_pnl": 0.0, "avg_r": 0.0, "count": 0}
+        wins, r_total, result_total = self.sums.tolist()
+        return {
+            "winrate": wins / self.count * 100,
+            "avg_pnl": result_total / self.count,
+            "avg_r": r_total / self.count,
+            "count": self.count
+        }
+
+
+class RollingMetrics:
+    """
+    Winrate, average result (pips) and average R over the last N closed trades.
+
+    Each window keeps ring buffers and running sums, so adding a trade costs
+    constant time regardless of journal size. Thresholds raise an alert when
+    a metric crosses them in either direction.
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, thresholds=None):
+        """
+        Initialize empty rolling windows.
+
+        Parameters:
+        -----------
+        windows : tuple
+            Window sizes in trades
+        thresholds : dict, optional
+            Metric names (see METRICS) mapped to alert thresholds
+        """
+        self.windows = {size: _RingWindow(size) for size in windows}
+        self.thresholds = thresholds or {}
+        self.alerts = []
+
+    def rebuild(self, trades_df):
+        """
+        Reset the windows from the most recent closed trades of a journal.
+
+        Parameters:
+        -----------
+        trades_df : pd.DataFrame
+            DataFrame containing trade records
+        """
+        self.restore(closed_trade_values(trades_df)[-max(self.windows, default=0):])
+
+    def restore(self, values):
+        """
+        Reset the windows from the values of the most recent closed trades.
+
+        Parameters:
+        -----------
+        values : np.ndarray
+            Rows of win flag, R multiple and result, oldest first, e.g. from
+            `closed_trade_values`
+        """
+        for size in list(self.windows):
+            window = _RingWindow(size)
+            recent = values[-size:]
+            window.buffer[:len(recent)] = recent
+            window.sums = recent.sum(axis=0) if len(recent) else np.zeros(3)
+            window.count = len(recent)
+            window.pos = len(recent) % size
+            self.windows[size] = window
+
+    def push(self, trade_data):
+        """
+        Add a trade to every window and record any threshold crossings.
+
+        Trades that are not closed (Win/Loss) are ignored.
+
+        Parameters:
+        -----------
+        trade_data : dict
+            Trade with status, rr and result
+
+        Returns:
+        --------
+        list
+            Alerts raised by this trade
+        """
+        status = trade_data.get('status')
+        if status not in ('Win', 'Loss'):
+            return []
+
+        rr = pd.to_numeric(trade_data.get('rr'), errors='coerce')
+        result = pd.to_numeric(trade_data.get('result'), errors='coerce')
+        rr = 0.0 if pd.isna(rr) else float(rr)
+        result = 0.0 if pd.isna(result) else float(result)
+        values = np.array([
+            1.0 if status == 'Win' else 0.0,
+            rr if status == 'Win' else -1.0,
+            result
+        ])
+
+        alerts = []
+        for size, window in self.windows.items():
+            before = window.metrics()
+            window.push(values)
+            after = window.metrics()
+            # Only alert on full windows, partial ones are too noisy
+            if window.count < size:
+                continue
+            for metric, threshold in self.thresholds.items():
+                if before['count'] < size:
+                    continue
+                if before[metric] >= threshold > after[metric]:
+                    alerts.append({"window": size, "metric": metric, "direction": "below",
+                                   "value": after[metric], "threshold": threshold})
+                elif before[metric] < threshold <= after[metric]:
+                    alerts.append({"window": size, "metric": metric, "direction": "above",
+                                   "value": after[metric], "threshold": threshold})
+
+        self.alerts.extend(alerts)
+        return alerts
+
+    def snapshot(self):
+        """
+        Get the current metrics of every window.
+
+        Returns:
+        --------
+        dict
+            Window size mapped to its metrics
+        """
+        return {size: window.metrics() for size, window in self.windows.items()}
+
+    def pop_alerts(self):
+        """
+        Get and clear the alerts raised since the last call.
+
+        Returns:
+        --------
+        list
+            Pending alerts
+        """
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+
+def rolling_metrics_history(trades_df, windows=DEFAULT_WINDOWS):
+    """
+    Calculate the rolling metrics after every closed trade of the journal.
+
+    Computed in one vectorized pass from cumulative sums, for charts.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+    windows : tuple
+        Window sizes in trades
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per closed trade with trade number and a
+        `<metric>_<window>` column per metric and window
+    """
+    win, r_multiple, result = _closed_trade_arrays(trades_df)
+    n = len(win)
+    history = {"trade_number": np.arange(1, n + 1)}
+
+    for size in windows:
+        count = np.minimum(np.arange(1, n + 1), size)
+        for metric, values, scale in [("winrate", win, 100), ("avg_pnl", result, 1), ("avg_r", r_multiple, 1)]:
+            cumulative = np.concatenate([[0.0], np.cumsum(values)])
+            window_sum = cumulative[1:] - cumulative[np.maximum(np.arange(1, n + 1) - size, 0)]
+            history[f"{metric}_{size}"] = window_sum / count * scale if n else window_sum
+
+    return pd.DataFrame(history)
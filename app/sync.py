@@ -0,0 +1,532 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+# Journal columns hashed as numbers; all other columns are hashed as text
+NUMERIC_COLUMNS = ['entry_price', 'stop_loss', 'take_profit', 'position_size', 'result', 'rr']
+
+# The Merkle summary has 2 ** TREE_DEPTH chunks; trades are assigned to chunks by trade ID
+TREE_DEPTH = 12
+
+_MASK64 = np.uint64(0xFFFFFFFF)
+
+
+def _mix(values):
+    """
+    Scramble 64-bit values (splitmix64 finalizer).
+
+    Parameters:
+    -----------
+    values : np.ndarray
+        uint64 values
+
+    Returns:
+    --------
+    np.ndarray
+        Scrambled uint64 values
+    """
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _column_hashes(series, numeric):
+    """
+    Hash the canonical form of one column.
+
+    Numbers are compared as float64 and text with missing values as empty
+    strings, so replicas that loaded the same trades with different dtypes
+    still agree.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        Column values
+    numeric : bool
+        Whether the column holds numbers
+
+    Returns:
+    --------
+    np.ndarray
+        uint64 hash per value
+    """
+    if numeric:
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64) + 0.0
+        return pd.util.hash_array(values, categorize=False)
+    values = series.astype(object).where(series.notna(), "").astype(str).to_numpy(dtype=object)
+    return pd.util.hash_array(values, categorize=False)
+
+
+def id_hashes(trade_ids):
+    """
+    Hash trade IDs the same way as the first column of `row_hashes`.
+
+    Parameters:
+    -----------
+    trade_ids : list or pd.Series
+        Trade IDs
+
+    Returns:
+    --------
+    np.ndarray
+        uint64 hash per trade ID
+    """
+    return _column_hashes(pd.Series(list(trade_ids), dtype=object), numeric=False)
+
+
+def row_hashes(trades_df):
+    """
+    Hash the trade ID and the full content of every trade.
+
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame containing trade records
+
+    Returns:
+    --------
+    np.ndarray
+        (n, 2) uint64 array of trade ID hash and content hash per trade
+    """
+    n = len(trades_df)
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.uint64)
+
+    with np.errstate(over='ignore'):
+        content = np.full(n, 0x345678, dtype=np.uint64)
+        for column in trades_df.columns:
+            hashed = _column_hashes(trades_df[column], column in NUMERIC_COLUMNS)
+            content = _mix(content ^ hashed ^ _mix(id_hashes([column])[0]))
+    return np.column_stack([_column_hashes(trades_df['trade_id'], numeric=False), content])
+
+
+def chunk_of(trade_id_hashes):
+    """
+    Get the Merkle chunk of each trade.
+
+    Parameters:
+    -----------
+    trade_id_hashes : np.ndarray
+        Trade ID hashes
+
+    Returns:
+    --------
+    np.ndarray
+        Chunk index per trade
+    """
+    return (np.asarray(trade_id_hashes, dtype=np.uint64) >> np.uint64(64 - TREE_DEPTH)).astype(np.int64)
+
+
+def merkle_summary(hashes):
+    """
+    Build the Merkle tree of a journal from its row hashes.
+
+    Each leaf summarizes the trades of one chunk independently of their
+    order, each inner node its two children, so two journals with the same
+    trades have the same root.
+
+    Parameters:
+    -----------
+    hashes : np.ndarray
+        (n, 2) array from `row_hashes`
+
+    Returns:
+    --------
+    list
+        One uint64 array per tree level, from the root (1 node) down to the
+        leaves (2 ** TREE_DEPTH nodes)
+    """
+    n_chunks = 1 << TREE_DEPTH
+    chunks = chunk_of(hashes[:, 0])
+
+    with np.errstate(over='ignore'):
+        mixed = _mix(hashes[:, 1])
+        # Sum 32-bit halves separately so float bincount stays exact, then wrap to 64 bits
+        low = np.bincount(chunks, weights=(mixed & _MASK64).astype(np.float64), minlength=n_chunks)
+        high = np.bincount(chunks, weights=(mixed >> np.uint64(32)).astype(np.float64), minlength=n_chunks)
+        counts = np.bincount(chunks, minlength=n_chunks).astype(np.uint64)
+        sums = low.astype(np.uint64) + (high.astype(np.uint64) << np.uint64(32))
+
+        levels = [_mix(sums ^ _mix(counts))]
+        while len(levels[0]) > 1:
+            children = levels[0]
+            levels.insert(0, _mix(_mix(children[0::2]) ^ children[1::2]))
+    return levels
+
+
+def diff_chunks(local_tree, remote_tree):
+    """
+    Find the chunks whose trades differ between two journals.
+
+    The trees are walked from the root and only the children of differing
+    nodes are compared, which is the exchange a remote peer would answer.
+
+    Parameters:
+    -----------
+    local_tree : list
+        Tree from `merkle_summary`
+    remote_tree : list
+        Tree from `merkle_summary`
+
+    Returns:
+    --------
+    tuple
+        Differing chunk indices and the number of tree nodes compared
+    """
+    positions = np.array([0])
+    compared = 1
+    positions = positions[local_tree[0][positions] != remote_tree[0][positions]]
+
+    for depth in range(1, len(local_tree)):
+        positions = np.concatenate([positions * 2, positions * 2 + 1])
+        compared += len(positions)
+        positions = np.sort(positions[local_tree[depth][positions] != remote_tree[depth][positions]])
+    return positions, compared
+
+
+def chunk_rows(journal, chunks):
+    """
+    Get the trades of a journal that fall in the given chunks.
+
+    Parameters:
+    -----------
+    journal : TradeJournal
+        Journal to read from
+    chunks : np.ndarray
+        Chunk indices
+
+    Returns:
+    --------
+    tuple
+        Trades in the chunks (pd.DataFrame) and their (n, 2) row hashes
+    """
+    hashes = journal.get_row_hashes()
+    mask = np.isin(chunk_of(hashes[:, 0]), chunks)
+    return journal.get_trades()[mask].reset_index(drop=True), hashes[mask]
+
+
+def _replica_id(journal):
+    """
+    Get the ID of a journal replica, creating it on first use.
+
+    Parameters:
+    -----------
+    journal : TradeJournal
+        Journal replica
+
+    Returns:
+    --------
+    str
+        Replica ID
+    """
+    path = os.path.join(journal.data_path, "replica_id")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            replica_id = f.read().strip()
+        if replica_id:
+            return replica_id
+
+    replica_id = uuid.uuid4().hex[:16]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(replica_id)
+    return replica_id
+
+
+def _base_file(journal, peer_id):
+    """
+    Get the path of the state stored after the last sync with a peer.
+    """
+    return os.path.join(journal.data_path, f"sync_base_{peer_id}.npz")
+
+
+def _load_base(local, remote, local_id, remote_id):
+    """
+    Load the trades both replicas agreed on at their last sync.
+
+    Parameters:
+    -----------
+    local, remote : TradeJournal
+        Journal replicas
+    local_id, remote_id : str
+        Replica IDs
+
+    Returns:
+    --------
+    tuple or None
+        (n, 2) row hashes sorted by trade ID hash and the Merkle root of
+        the agreed trades, None if the replicas have no common sync state
+    """
+    try:
+        with np.load(_base_file(local, remote_id)) as local_base, \
+                np.load(_base_file(remote, local_id)) as remote_base:
+            if str(local_base['sync_id']) != str(remote_base['sync_id']):
+                return None
+            return local_base['hashes'], int(local_base['root'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_base(local, remote, local_id, remote_id, hashes, root):
+    """
+    Store the agreed trades in both replicas for the next three-way merge.
+
+    Parameters:
+    -----------
+    local, remote : TradeJournal
+        Journal replicas
+    local_id, remote_id : str
+        Replica IDs
+    hashes : np.ndarray
+        (n, 2) row hashes of the merged journal
+    root : int
+        Merkle root of the merged journal
+    """
+    hashes = hashes[np.argsort(hashes[:, 0], kind='stable')]
+    sync_id = uuid.uuid4().hex
+    for journal, peer_id in ((local, remote_id), (remote, local_id)):
+        path = _base_file(journal, peer_id)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, sync_id=np.array(sync_id), hashes=hashes, root=np.uint64(root))
+        os.replace(path + ".tmp", path)
+
+
+def _base_hashes(base, trade_id_hashes):
+    """
+    Look up the content hashes trades had at the last sync.
+
+    Parameters:
+    -----------
+    base : np.ndarray or None
+        State from `_load_base`
+    trade_id_hashes : np.ndarray
+        Trade ID hashes to look up
+
+    Returns:
+    --------
+    tuple
+        Whether each trade existed at the last sync and its content hash then
+    """
+    if base is None or len(base) == 0:
+        return np.zeros(len(trade_id_hashes), dtype=bool), np.zeros(len(trade_id_hashes), dtype=np.uint64)
+    idx = np.minimum(np.searchsorted(base[:, 0], trade_id_hashes), len(base) - 1)
+    known = base[idx, 0] == trade_id_hashes
+    return known, np.where(known, base[idx, 1], 0)
+
+
+def _differing_columns(local_row, remote_row, columns):
+    """
+    List the columns whose canonical values differ between two versions of a trade.
+    """
+    differing = []
+    for column in columns:
+        numeric = column in NUMERIC_COLUMNS
+        left = _column_hashes(pd.Series([local_row.get(column)], dtype=object), numeric)
+        right = _column_hashes(pd.Series([remote_row.get(column)], dtype=object), numeric)
+        if left[0] != right[0]:
+            differing.append(column)
+    return differing
+
+
+def _prefer_remote(local_row, remote_row, local_hash, remote_hash):
+    """
+    Pick the winner of a true conflict the same way on both replicas.
+
+    A closed trade wins over an open one, otherwise the version with the
+    larger content hash wins, which is arbitrary but symmetric.
+    """
+    local_closed = local_row.get('status') in ('Win', 'Loss')
+    remote_closed = remote_row.get('status') in ('Win', 'Loss')
+    if local_closed != remote_closed:
+        return remote_closed
+    return remote_hash > local_hash
+
+
+def merge_chunks(local_rows, local_hashes, remote_rows, remote_hashes, base=None):
+    """
+    Merge the trades of differing chunks from two replicas.
+
+    With the state of the last sync (`base`) this is a three-way merge: a
+    trade changed on one side only takes that side, a trade missing on one
+    side is either new (copied over) or deleted there (deleted on the other
+    side too). Trades changed on both sides are conflicts and are resolved
+    deterministically by `_prefer_remote`; a trade edited on one side and
+    deleted on the other is kept. Without a base the merge is a union.
+
+    Parameters:
+    -----------
+    local_rows, remote_rows : pd.DataFrame
+        Trades of the differing chunks, from `chunk_rows`
+    local_hashes, remote_hashes : np.ndarray
+        Their row hashes
+    base : np.ndarray, optional
+        State from the last sync
+
+    Returns:
+    --------
+    dict
+        Changes to apply to each side (`local` and `remote`, each with
+        `add` DataFrame, `update` dict of trade ID to fields and `delete`
+        list) and the list of conflicts
+    """
+    columns = [col for col in local_rows.columns if col != 'trade_id'] or \
+              [col for col in remote_rows.columns if col != 'trade_id']
+    changes = {
+        side: {"add": [], "update": {}, "delete": []} for side in ("local", "remote")
+    }
+    conflicts = []
+
+    # Content hashes cover the trade ID, so equal hashes are the same trade unchanged
+    local_changed = np.flatnonzero(~np.isin(local_hashes[:, 1], remote_hashes[:, 1]))
+    remote_changed = np.flatnonzero(~np.isin(remote_hashes[:, 1], local_hashes[:, 1]))
+    local_index = dict(zip(local_hashes[local_changed, 0].tolist(), local_changed.tolist()))
+    remote_index = dict(zip(remote_hashes[remote_changed, 0].tolist(), remote_changed.tolist()))
+    all_ids = np.array(sorted(set(local_index) | set(remote_index)), dtype=np.uint64)
+    known, base_content = _base_hashes(base, all_ids)
+
+    for id_hash, in_base, base_hash in zip(all_ids.tolist(), known.tolist(), base_content.tolist()):
+        li = local_index.get(id_hash)
+        ri = remote_index.get(id_hash)
+        local_row = local_rows.iloc[li].to_dict() if li is not None else None
+        remote_row = remote_rows.iloc[ri].to_dict() if ri is not None else None
+
+        if local_row is None or remote_row is None:
+            present_side, missing_side = ("local", "remote") if remote_row is None else ("remote", "local")
+            row = local_row if remote_row is None else remote_row
+            row_hash = int((local_hashes[li] if remote_row is None else remote_hashes[ri])[1])
+
+            if not in_base:
+                changes[missing_side]["add"].append(row)
+            elif row_hash == base_hash:
+                changes[present_side]["delete"].append(row['trade_id'])
+            else:
+                changes[missing_side]["add"].append(row)
+                conflicts.append({"trade_id": row['trade_id'], "kind": "edit/delete",
+                                  "kept": present_side, "columns": []})
+            continue
+
+        local_hash = int(local_hashes[li, 1])
+        remote_hash = int(remote_hashes[ri, 1])
+        if local_hash == remote_hash:
+            continue
+        differing = _differing_columns(local_row, remote_row, columns)
+        if not differing:
+            continue
+
+        if in_base and local_hash == base_hash:
+            take_remote = True
+        elif in_base and remote_hash == base_hash:
+            take_remote = False
+        else:
+            take_remote = _prefer_remote(local_row, remote_row, local_hash, remote_hash)
+            conflicts.append({"trade_id": local_row['trade_id'], "kind": "edit/edit",
+                              "kept": "remote" if take_remote else "local", "columns": differing})
+
+        winner, target = (remote_row, "local") if take_remote else (local_row, "remote")
+        changes[target]["update"][winner['trade_id']] = {col: winner.get(col) for col in differing}
+
+    for side in changes.values():
+        side["add"] = pd.DataFrame(side["add"])
+    return {"local": changes["local"], "remote": changes["remote"], "conflicts": conflicts}
+
+
+def _apply(journal, changes):
+    """
+    Apply merge changes to one replica.
+
+    Parameters:
+    -----------
+    journal : TradeJournal
+        Journal replica
+    changes : dict
+        One side of the result of `merge_chunks`
+
+    Returns:
+    --------
+    bool
+        True if every change was written successfully
+    """
+    ok = True
+    if not changes["add"].empty:
+        ok &= journal.add_trades(changes["add"])
+    for trade_id, fields in changes["update"].items():
+        ok &= journal.update_trade(trade_id, fields)
+    for trade_id in changes["delete"]:
+        ok &= journal.delete_trade(trade_id)
+    return bool(ok)
+
+
+def sync_journals(local, remote):
+    """
+    Reconcile two journal replicas so both end up with the same trades.
+
+    Only the Merkle summaries and the trades of differing chunks are
+    compared. Row hashes are maintained by the journals and stored in their
+    checkpoints, so replicas that differ by a few trades reconcile without
+    rehashing or diffing the whole journal.
+
+    Parameters:
+    -----------
+    local : TradeJournal
+        Local replica
+    remote : TradeJournal
+        Remote replica
+
+    Returns:
+    --------
+    dict
+        Differing chunks, tree nodes compared, trades exchanged, changes
+        applied to each side, the conflicts and whether both replicas
+        now match
+    """
+    local_id, remote_id = _replica_id(local), _replica_id(remote)
+    if local_id == remote_id:
+        # The remote directory was copied from the local one; give it its own identity
+        os.remove(os.path.join(remote.data_path, "replica_id"))
+        remote_id = _replica_id(remote)
+    local_hashes = local.get_row_hashes()
+    local_tree = merkle_summary(local_hashes)
+    remote_tree = merkle_summary(remote.get_row_hashes())
+    chunks, compared = diff_chunks(local_tree, remote_tree)
+    base = _load_base(local, remote, local_id, remote_id)
+
+    report = {
+        "chunks": len(chunks),
+        "nodes_compared": compared,
+        "rows_exchanged": 0,
+        "added_local": 0, "updated_local": 0, "deleted_local": 0,
+        "added_remote": 0, "updated_remote": 0, "deleted_remote": 0,
+        "conflicts": pd.DataFrame(columns=["trade_id", "kind", "kept", "columns"]),
+        "in_sync": len(chunks) == 0
+    }
+    if len(chunks) == 0:
+        if base is None or base[1] != int(local_tree[0][0]):
+            _save_base(local, remote, local_id, remote_id, local_hashes, int(local_tree[0][0]))
+        return report
+
+    local_rows, local_chunk_hashes = chunk_rows(local, chunks)
+    remote_rows, remote_chunk_hashes = chunk_rows(remote, chunks)
+    merged = merge_chunks(local_rows, local_chunk_hashes, remote_rows, remote_chunk_hashes,
+                          base[0] if base is not None else None)
+
+    applied = _apply(local, merged["local"]) and _apply(remote, merged["remote"])
+
+    local_hashes = local.get_row_hashes()
+    root = merkle_summary(local_hashes)[0][0]
+    in_sync = applied and root == merkle_summary(remote.get_row_hashes())[0][0]
+    if in_sync:
+        _save_base(local, remote, local_id, remote_id, local_hashes, int(root))
+
+    for side in ("local", "remote"):
+        report[f"added_{side}"] = len(merged[side]["add"])
+        report[f"updated_{side}"] = len(merged[side]["update"])
+        report[f"deleted_{side}"] = len(merged[side]["delete"])
+    report["rows_exchanged"] = len(local_rows) + len(remote_rows)
+    if merged["conflicts"]:
+        report["conflicts"] = pd.DataFrame(merged["conflicts"])
+    report["in_sync"] = bool(in_sync)
+    return report
@@ -1,47 +1,121 @@
 import numpy as np
 import pandas as pd
 
+from instruments import DEFAULT_PIP_VALUE, CrossRateTable, is_known_instrument, pip_size
 
-def calculate_position_size(account_balance, risk_percentage, entry_price, stop_loss):
+
+def _pip_value(pair, account_currency, price, rate_table):
+    """
+    Get the value of one pip for one lot, DEFAULT_PIP_VALUE for unknown instruments.
+    """
+    if not is_known_instrument(pair):
+        return DEFAULT_PIP_VALUE
+    return rate_table.pip_value(pair, account_currency, price=price)
+
+
+def calculate_position_size(account_balance, risk_percentage, entry_price, stop_loss,
+                            pair="EUR/USD", account_currency="USD", rate_table=None):
     """
     Calculate the position size based on risk parameters.
     
     Parameters:
     -----------
     account_balance : float
-        Total account balance in USD
+        Total account balance in the account currency
     risk_percentage : float
         Risk per trade as a percentage (e.g., 1 for 1%)
     entry_price : float
         Entry price of the trade
     stop_loss : float
         Stop loss price
+    pair : str
+        Instrument traded, looked up in the instrument registry
+    account_currency : str
+        Currency of the trading account
+    rate_table : CrossRateTable, optional
+        Conversion rates for pip values; without it only instruments quoted in
+        (or based on) the account currency can be sized
     
     Returns:
     --------
     dict
-        Dictionary containing position size, risk amount, and pips at risk
+        Dictionary containing position size, risk amount, pips at risk and pip value;
+        instruments missing from the registry are sized with DEFAULT_PIP_VALUE
     """
-    # Risk amount in USD
+    # Risk amount in account currency
     risk_amount = account_balance * (risk_percentage / 100)
     
     # Calculate pips at risk
-    pips_at_risk = abs(entry_price - stop_loss)
+    pips_at_risk = abs(entry_price - stop_loss) / pip_size(pair)
     
-    # Position size calculation (simplified for forex standard lots)
-    # 1 pip = 0.0001 for most pairs, 1 standard lot = 100,000 units
-    pip_value = 10  # Assuming $10 per pip for 1 standard lot
+    # Value of 1 pip for 1 lot in account currency
+    pip_value = _pip_value(pair, account_currency, entry_price, rate_table or CrossRateTable(None))
     
     # Calculate position size in lots
-    position_size = risk_amount / (pips_at_risk * pip_value)
+    position_size = risk_amount / (pips_at_risk * pip_value) if pips_at_risk > 0 else 0
     
     return {
         "position_size": position_size,
         "risk_amount": risk_amount,
-        "pips_at_risk": pips_at_risk
+        "pips_at_risk": pips_at_risk,
+        "pip_value": pip_value
     }
 
 
+def calculate_position_sizes(trades_df, account_balance, risk_percentage,
+                             account_currency="USD", rate_table=None):
+    """
+    Calculate position sizes for many trades at once.
+    
+    Pip sizes and pip values are looked up once per instrument and the sizing
+    itself is vectorized over all rows.
+    
+    Parameters:
+    -----------
+    trades_df : pd.DataFrame
+        DataFrame with pair, entry_price and stop_loss columns
+    account_balance : float
+        Total account balance in the account currency
+    risk_percentage : float
+        Risk per trade as a percentage (e.g., 1 for 1%)
+    account_currency : str
+        Currency of the trading account
+    rate_table : CrossRateTable, optional
+        Conversion rates for pip values
+    
+    Returns:
+    --------
+    pd.DataFrame
+        DataFrame with position_size, risk_amount, pips_at_risk and pip_value
+        columns, indexed like trades_df; rows that can't be sized are NaN
+    """
+    rate_table = rate_table or CrossRateTable(None)
+    risk_amount = account_balance * (risk_percentage / 100)
+    
+    entry = pd.to_numeric(trades_df['entry_price'], errors='coerce')
+    stop = pd.to_numeric(trades_df['stop_loss'], errors='coerce')
+    
+    # One registry and conversion lookup per instrument
+    pip_sizes = {}
+    pip_values = {}
+    for pair, price in entry.groupby(trades_df['pair']).first().items():
+        pip_sizes[pair] = pip_size(pair)
+        try:
+            pip_values[pair] = _pip_value(pair, account_currency, price, rate_table)
+        except ValueError:
+            pip_values[pair] = np.nan
+    
+    pips_at_risk = (entry - stop).abs() / trades_df['pair'].map(pip_sizes)
+    pip_value = trades_df['pair'].map(pip_values)
+    
+    return pd.DataFrame({
+        "position_size": risk_amount / (pips_at_risk * pip_value).replace(0, np.nan),
+        "risk_amount": risk_amount,
+        "pips_at_risk": pips_at_risk,
+        "pip_value": pip_value
+    }, index=trades_df.index)
+
+
 def calculate_risk_reward_ratio(entry_price, stop_loss, take_profit=None):
     """
     Calculate the risk-to-reward ratio.
@@ -107,6 +181,50 @@ def calculate_expected_value(avg_rr, winrate, risk_per_trade):
     }
 
 
+def calculate_distribution_expected_value(r_multiples, risk_per_trade, n_resamples=2000, seed=None):
+    """
+    Calculate the expected value per trade from a distribution of trade outcomes.
+
+    Unlike `calculate_expected_value`, outcomes are not limited to a full win
+    at the average R:R or a full 1R loss, e.g. the effective R multiples from
+    `management.simulate_management`.
+
+    Parameters:
+    -----------
+    r_multiples : np.ndarray
+        Outcome of each trade in R
+    risk_per_trade : float
+        Risk per trade as a percentage of account
+    n_resamples : int
+        Number of resampled trade sequences for the projection ranges
+    seed : int, optional
+        Seed for reproducible projection ranges
+
+    Returns:
+    --------
+    dict
+        Dictionary containing expected value and profit projections, plus the
+        5th-95th percentile range of each projection
+    """
+    r_multiples = np.asarray(r_multiples, dtype=float)
+    ev_per_trade = r_multiples.mean() * risk_per_trade
+
+    rng = np.random.default_rng(seed)
+    projections = {}
+    projection_ranges = {}
+    for n_trades in [10, 50, 100]:
+        projections[n_trades] = ev_per_trade * n_trades
+        totals = r_multiples[rng.integers(0, len(r_multiples), (n_resamples, n_trades))].sum(axis=1)
+        low, high = np.percentile(totals * risk_per_trade, [5, 95])
+        projection_ranges[n_trades] = (low, high)
+
+    return {
+        "expected_value_per_trade": ev_per_trade,
+        "projections": projections,
+        "projection_ranges": projection_ranges
+    }
+
+
 def calculate_trade_statistics(trades_df):
     """
     Calculate statistics from trade journal.
@@ -127,13 +245,18 @@ def calculate_trade_statistics(trades_df):
             "avg_rr": 0,
             "total_pnl": 0,
             "win_count": 0,
-            "loss_count": 0
+            "loss_count": 0,
+            "open_count": 0
         }
     
     # Convert result column to numeric if it's not
     if trades_df['result'].dtype == 'object':
         trades_df['result'] = pd.to_numeric(trades_df['result'], errors='coerce')
     
+    # Open trades have no outcome yet and are left out of the statistics
+    open_count = len(trades_df[trades_df['status'] == 'Open'])
+    trades_df = trades_df[trades_df['status'] != 'Open']
+    
     win_count = len(trades_df[trades_df['status'] == 'Win'])
     loss_count = len(trades_df[trades_df['status'] == 'Loss'])
     total_trades = win_count + loss_count
@@ -154,5 +277,6 @@ def calculate_trade_statistics(trades_df):
         "avg_rr": avg_rr,
         "total_pnl": total_pnl,
         "win_count": win_count,
-        "loss_count": loss_count
+        "loss_count": loss_count,
+        "open_count": open_count
     } 
\ No newline at end of file
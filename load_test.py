@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+
+"""
+Trade Tools - Load Test Harness
+
+This script simulates many traders using the app at once against a synthetic
+journal and reports latency percentiles per action, throughput, errors and
+lost writes.
+
+Two modes are available:
+- direct:  workers call TradeJournal and the analytics behind the pages
+           (what every Streamlit rerun executes), without the UI
+- apptest: workers drive app/main.py headlessly through Streamlit's
+           testing API (streamlit.testing.v1.AppTest)
+
+Example:
+    python load_test.py --workers 50 --iterations 20 --journal-size 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add app directory to path for imports
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app")
+sys.path.append(APP_DIR)
+
+from data_handler import TradeJournal
+from utils import calculate_trade_statistics, calculate_expected_value
+from bootstrap import bootstrap_trade_statistics
+from rolling import rolling_metrics_history
+
+PAIRS = ["EUR/USD", "GBP/USD", "USD/JPY", "XAU/USD", "AUD/USD"]
+
+
+def generate_journal(data_path, n_trades, seed=0):
+    """
+    Write a synthetic journal of closed trades.
+
+    Parameters:
+    -----------
+    data_path : str
+        Directory to write the journal to
+    n_trades : int
+        Number of trades
+    seed : int
+        Seed for reproducible journals
+    """
+    rng = np.random.default_rng(seed)
+    win = rng.random(n_trades) < 0.45
+    entry = 1 + rng.random(n_trades)
+    risk = 0.001 + rng.random(n_trades) * 0.01
+    rr = np.round(1 + rng.random(n_trades) * 2, 2)
+
+    trades_df = pd.DataFrame({
+        'trade_id': [f"{i:016x}" for i in rng.integers(0, 2 ** 62, n_trades)],
+        'date': pd.date_range("2018-01-01", periods=n_trades, freq="15min").strftime("%Y-%m-%d %H:%M"),
+        'pair': rng.choice(PAIRS, n_trades),
+        'entry_price': entry,
+        'stop_loss': entry - risk,
+        'take_profit': entry + risk * rr,
+        'position_size': 0.1,
+        'result': np.where(win, np.round(risk * rr * 10000, 1), -np.round(risk * 10000, 1)),
+        'status': np.where(win, "Win", "Loss"),
+        'rr': rr,
+        'notes': ""
+    })
+
+    os.makedirs(data_path, exist_ok=True)
+
+    # Pending changes and checkpoints of a previous journal would be replayed onto this one
+    changes_file = os.path.join(data_path, "trade_journal_changes.jsonl")
+    if os.path.exists(changes_file):
+        os.remove(changes_file)
+    shutil.rmtree(os.path.join(data_path, "trade_journal.ckpt"), ignore_errors=True)
+
+    trades_df.to_csv(os.path.join(data_path, "trade_journal.csv"), index=False)
+
+    # Let the journal write its checkpoint once, as a running server would have
+    TradeJournal(data_path).compact()
+
+
+def random_trade(rng):
+    """
+    Build a random closed trade as submitted by the Add Trade form.
+
+    Parameters:
+    -----------
+    rng : random.Random
+        Random generator of the worker
+
+    Returns:
+    --------
+    dict
+        Trade data
+    """
+    entry = round(1 + rng.random(), 4)
+    win = rng.random() < 0.45
+    return {
+        "pair": rng.choice(PAIRS),
+        "entry_price": entry,
+        "stop_loss": round(entry - 0.005, 4),
+        "take_profit": round(entry + 0.01, 4),
+        "position_size": 0.1,
+        "result": 100.0 if win else -50.0,
+        "status": "Win" if win else "Loss",
+        "rr": 2.0,
+        "notes": "load test"
+    }
+
+
+class Recorder:
+    """
+    Thread-safe collection of per-action latencies, errors and written trade IDs.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.written_ids = []
+
+    def timed(self, action, func, *args):
+        """
+        Run and time one action.
+
+        Parameters:
+        -----------
+        action : str
+            Action name used in the report
+        func : callable
+            Action to run
+        *args
+            Arguments passed to func
+
+        Returns:
+        --------
+        object
+            Return value of func, None if it raised
+        """
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+            failed = False
+        except Exception:
+            result = None
+            failed = True
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.latencies[action].append(elapsed)
+            if failed:
+                self.errors[action] += 1
+        return result
+
+
+def direct_session(data_path, iterations, seed, recorder):
+    """
+    Simulate one trader through direct calls to the journal and analytics.
+
+    Every iteration mirrors a Streamlit rerun: the journal is loaded, a trade
+    is added, then Trade History and Expected Profit Projection are computed.
+    Confidence intervals are timed separately, as they are only computed when
+    requested.
+
+    Parameters:
+    -----------
+    data_path : str
+        Journal directory shared by all workers
+    iterations : int
+        Number of iterations
+    seed : int
+        Seed of the worker
+    recorder : Recorder
+        Collects the measurements
+    """
+    rng = random.Random(seed)
+
+    for _ in range(iterations):
+        journal = recorder.timed("load_journal", TradeJournal, data_path)
+        if journal is None:
+            continue
+
+        trade = random_trade(rng)
+        ok = recorder.timed("add_trade", journal.add_trade, trade)
+        if ok:
+            with recorder.lock:
+                recorder.written_ids.append(trade['trade_id'])
+        elif ok is False:
+            with recorder.lock:
+                recorder.errors["add_trade"] += 1
+
+        def trade_history():
+            trades_df = journal.get_trades()
+            calculate_trade_statistics(trades_df)
+            rolling_metrics_history(trades_df)
+
+        recorder.timed("trade_history", trade_history)
+        recorder.timed("confidence_intervals", bootstrap_trade_statistics,
+                       journal.get_trades(), 20000, 95, journal.get_version())
+
+        def profit_projection():
+            stats = calculate_trade_statistics(journal.get_trades())
+            calculate_expected_value(stats['avg_rr'], stats['winrate'], 1.0)
+
+        recorder.timed("profit_projection", profit_projection)
+
+
+def apptest_session(data_path, iterations, seed, recorder):
+    """
+    Simulate one trader by driving the Streamlit page headlessly.
+
+    Parameters:
+    -----------
+    data_path : str
+        Journal directory shared by all workers
+    iterations : int
+        Number of iterations
+    seed : int
+        Seed of the worker
+    recorder : Recorder
+        Collects the measurements
+    """
+    from streamlit.testing.v1 import AppTest
+
+    def run(at):
+        at.run()
+        if len(at.exception):
+            raise RuntimeError(at.exception[0].message)
+        return True
+
+    def button(at, label):
+        return next(b for b in at.button if b.label == label)
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "main.py"), default_timeout=300)
+    recorder.timed("open_app", run, at)
+
+    for _ in range(iterations):
+        at.sidebar.radio[0].set_value("Manual Trade Journal")
+        recorder.timed("show_trade_journal", run, at)
+
+        # The form is submitted with its defaults; written trades are counted, not identified
+        button(at, "Add Trade to Journal").click()
+        if recorder.timed("add_trade", run, at):
+            with recorder.lock:
+                recorder.written_ids.append(None)
+
+        at.sidebar.radio[0].set_value("Expected Profit Projection")
+        recorder.timed("show_profit_projection", run, at)
+        button(at, "Calculate Projection").click()
+        recorder.timed("calculate_projection", run, at)
+
+
+def report(recorder, wall_time, data_path, initial_size, mode):
+    """
+    Print latency percentiles, throughput, errors and lost writes.
+
+    Parameters:
+    -----------
+    recorder : Recorder
+        Collected measurements
+    wall_time : float
+        Duration of the run in seconds
+    data_path : str
+        Journal directory
+    initial_size : int
+        Number of trades before the run
+    mode : str
+        Load test mode
+    """
+    rows = []
+    for action, latencies in recorder.latencies.items():
+        latencies = np.array(latencies) * 1000
+        rows.append({
+            "action": action,
+            "count": len(latencies),
+            "p50_ms": np.percentile(latencies, 50),
+            "p95_ms": np.percentile(latencies, 95),
+            "p99_ms": np.percentile(latencies, 99),
+            "errors": recorder.errors.get(action, 0)
+        })
+
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+    print(f"\nWall time: {wall_time:.1f} s, throughput: {total / wall_time:.1f} actions/s")
+
+    final_df = TradeJournal(data_path).get_trades()
+    written = len(recorder.written_ids)
+    if mode == "direct":
+        lost = len(set(recorder.written_ids) - set(final_df['trade_id']))
+    else:
+        lost = max(initial_size + written - len(final_df), 0)
+    print(f"Trades written: {written}, journal size: {initial_size} -> {len(final_df)}, lost writes: {lost}")
+
+
+def main():
+    """Main entry point for the load test."""
+    parser = argparse.ArgumentParser(description="Load test Trade Tools with concurrent simulated sessions.")
+    parser.add_argument("--mode", choices=["direct", "apptest"], default="direct")
+    parser.add_argument("--workers", type=int, default=50, help="Number of concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=10, help="Iterations per session")
+    parser.add_argument("--journal-size", type=int, default=10000, help="Trades in the synthetic journal")
+    parser.add_argument("--data-dir", default=None, help="Journal directory (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary journal directory")
+    parser.add_argument("--force", action="store_true",
+                        help="Overwrite an existing journal in --data-dir")
+    args = parser.parse_args()
+
+    if args.data_dir and os.path.exists(os.path.join(args.data_dir, "trade_journal.csv")) and not args.force:
+        parser.error(f"{args.data_dir} already contains a trade journal; "
+                     "use --force to overwrite it with a synthetic one")
+
+    data_path = args.data_dir or tempfile.mkdtemp(prefix="trade_tools_load_")
+    print(f"Generating a journal of {args.journal_size} trades in {data_path}...")
+    generate_journal(data_path, args.journal_size)
+
+    # The page reads its data directory from the environment
+    os.environ["TRADE_TOOLS_DATA"] = data_path
+
+    session = direct_session if args.mode == "direct" else apptest_session
+    recorder = Recorder()
+
+    print(f"Running {args.workers} concurrent {args.mode} sessions x {args.iterations} iterations...")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(session, data_path, args.iterations, seed, recorder)
+            for seed in range(args.workers)
+        ]
+        for future in futures:
+            future.result()
+    wall_time = time.perf_counter() - start
+
+    report(recorder, wall_time, data_path, args.journal_size, args.mode)
+
+    if args.data_dir is None and not args.keep:
+        shutil.rmtree(data_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
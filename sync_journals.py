@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Trade Tools - Journal Sync Script
+
+This script reconciles two copies of the trade journal, e.g. a laptop and
+the desk server, so both end up with the same trades.
+
+Example:
+    python sync_journals.py data /mnt/desk/trade-tools/data
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add app directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data_handler import TradeJournal
+from sync import sync_journals
+
+
+def main():
+    """Main entry point for journal sync."""
+    parser = argparse.ArgumentParser(description="Sync two trade journal directories.")
+    parser.add_argument("local", help="Data directory of the local journal")
+    parser.add_argument("remote", help="Data directory of the remote journal")
+    args = parser.parse_args()
+
+    for path in (args.local, args.remote):
+        if not os.path.exists(os.path.join(path, "trade_journal.csv")):
+            print(f"Error: No trade journal found in {path}")
+            sys.exit(1)
+
+    local = TradeJournal(args.local)
+    remote = TradeJournal(args.remote)
+
+    start = time.perf_counter()
+    report = sync_journals(local, remote)
+    elapsed = time.perf_counter() - start
+
+    print(f"Compared {report['nodes_compared']} summary nodes, {report['chunks']} chunks differ, "
+          f"{report['rows_exchanged']} trades exchanged in {elapsed:.2f} s")
+    for side in ("local", "remote"):
+        print(f"{side.capitalize()}: {report[f'added_{side}']} added, "
+              f"{report[f'updated_{side}']} updated, {report[f'deleted_{side}']} deleted")
+
+    if not report['conflicts'].empty:
+        print(f"\n{len(report['conflicts'])} conflicts resolved:")
+        print(report['conflicts'].to_string(index=False))
+
+    if not report['in_sync']:
+        print("\nError: Journals still differ after sync")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
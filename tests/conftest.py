@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+# The app modules import each other by module name, as when run from app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from data_handler import TradeJournal
+
+
+def _trade(status="Win", result=10.0, pair="EUR/USD", notes="", **fields):
+    trade = {
+        "pair": pair,
+        "entry_price": 1.1,
+        "stop_loss": 1.095,
+        "take_profit": 1.11,
+        "position_size": 0.1,
+        "result": result,
+        "status": status,
+        "rr": 2.0,
+        "notes": notes
+    }
+    trade.update(fields)
+    return trade
+
+
+@pytest.fixture
+def make_trade():
+    """Build a journal entry; keyword arguments override the defaults."""
+    return _trade
+
+
+@pytest.fixture
+def reload_journal():
+    """Open a fresh TradeJournal on another journal's data directory."""
+    return lambda journal: TradeJournal(journal.data_path)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import OHLC_DTYPE, _first_touch, backtest_trades, convert_ohlc_csv, summarize_backtest
+
+
+def _random_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    open_ = np.concatenate([[1.1], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0003, (2, n)))
+    bars = np.zeros(n, dtype=OHLC_DTYPE)
+    bars['time'] = pd.date_range("2024-01-01", periods=n, freq="h").to_numpy()
+    bars['open'] = open_
+    bars['close'] = close
+    bars['high'] = np.maximum(open_, close) + spread[0]
+    bars['low'] = np.minimum(open_, close) - spread[1]
+    return bars
+
+
+def _first_touch_loop(bars, start, stop_loss, take_profit, direction):
+    exit_bar = np.full(stop_loss.shape, -1)
+    stopped = np.zeros(stop_loss.shape, dtype=bool)
+    for t in range(stop_loss.shape[0]):
+        for v in range(stop_loss.shape[1]):
+            for i in range(start[t], len(bars)):
+                if direction[t] > 0:
+                    sl_hit = bars['low'][i] <= stop_loss[t, v]
+                    tp_hit = bars['high'][i] >= take_profit[t, v]
+                else:
+                    sl_hit = bars['high'][i] >= stop_loss[t, v]
+                    tp_hit = bars['low'][i] <= take_profit[t, v]
+                if sl_hit or tp_hit:
+                    exit_bar[t, v] = i
+                    stopped[t, v] = sl_hit
+                    break
+    return exit_bar, stopped
+
+
+@pytest.mark.parametrize("window", [1, 3, 256])
+def test_first_touch_matches_bar_by_bar_scan(window):
+    bars = _random_bars(400)
+    rng = np.random.default_rng(1)
+    n_trades = 40
+    start = rng.integers(0, 420, n_trades)
+    direction = np.where(rng.random(n_trades) < 0.5, 1.0, -1.0)
+    entry = bars['open'][np.minimum(start, len(bars) - 1)]
+    risk = np.array([0.001, 0.002, 0.01])
+    stop_loss = entry[:, None] - direction[:, None] * risk
+    take_profit = entry[:, None] + direction[:, None] * np.array([0.002, 0.004, np.inf])
+    # A variant without a target only exits at its stop
+    take_profit[:, 2] = direction * np.inf
+
+    expected = _first_touch_loop(bars, start, stop_loss, take_profit, direction)
+    exit_bar, stopped = _first_touch(bars, start, stop_loss, take_profit, direction, window)
+
+    np.testing.assert_array_equal(exit_bar, expected[0])
+    np.testing.assert_array_equal(stopped[exit_bar >= 0], expected[1][exit_bar >= 0])
+
+
+def test_backtest_trades_against_bar_file(tmp_path):
+    bars = pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=4, freq="h"),
+        "open": [1.1000, 1.1000, 1.1030, 1.0980],
+        "high": [1.1010, 1.1040, 1.1040, 1.0990],
+        "low": [1.0990, 1.0988, 1.0970, 1.0900],
+        "close": [1.1000, 1.1030, 1.0980, 1.0950],
+    })
+    bars.to_csv(tmp_path / "eurusd.csv", index=False)
+    assert convert_ohlc_csv(tmp_path / "eurusd.csv", tmp_path / "EURUSD.npy") == 4
+
+    trades_df = pd.DataFrame([{
+        "trade_id": "a", "date": "2024-01-01 01:00", "pair": "EUR/USD", "entry_price": 1.1000,
+        "stop_loss": 1.0980, "take_profit": 1.1040, "status": "Win", "result": 40.0
+    }])
+    variants = [
+        {"name": "Recorded", "stop_mult": 1.0, "target_mult": 1.0},
+        {"name": "Tight", "stop_mult": 0.5, "target_mult": 1.0},
+        {"name": "Far", "stop_mult": 1.0, "target_mult": 3.0},
+    ]
+    results = backtest_trades(trades_df, str(tmp_path), variants).set_index("variant")
+
+    assert results.loc["Recorded", "outcome"] == "Win"
+    assert results.loc["Recorded", "r_multiple"] == pytest.approx(2)
+    assert results.loc["Tight", "outcome"] == "Loss"
+    assert results.loc["Tight", "r_multiple"] == pytest.approx(-0.5)
+    assert results.loc["Far", "outcome"] == "Loss"
+    assert results.loc["Recorded", "matches_recorded"]
+
+    summary = summarize_backtest(results.reset_index()).set_index("variant")
+    assert summary.loc["Recorded", "wins"] == 1
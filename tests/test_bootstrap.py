@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bootstrap
+from bootstrap import bootstrap_trade_statistics
+
+
+def _journal(n, winrate=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    win = rng.random(n) < winrate
+    return pd.DataFrame({
+        "status": np.where(win, "Win", "Loss"),
+        "rr": 2.0,
+        "result": np.where(win, 20.0, -10.0)
+    })
+
+
+def test_estimates_match_journal_and_lie_in_interval():
+    trades_df = _journal(500)
+    intervals = bootstrap_trade_statistics(trades_df, n_resamples=2000, seed=1)
+
+    winrate = (trades_df["status"] == "Win").mean() * 100
+    assert intervals["winrate"]["estimate"] == pytest.approx(winrate)
+    assert intervals["total_pnl"]["estimate"] == pytest.approx(trades_df["result"].sum())
+    assert intervals["expectancy"]["estimate"] == pytest.approx(winrate / 100 * 3 - 1)
+    for ci in intervals.values():
+        assert ci["lower"] <= ci["estimate"] <= ci["upper"]
+
+
+def test_open_trades_are_ignored_and_small_journals_return_none():
+    trades_df = _journal(1)
+    assert bootstrap_trade_statistics(trades_df) is None
+
+    trades_df = pd.concat([_journal(50), pd.DataFrame([{"status": "Open", "rr": None, "result": None}])])
+    intervals = bootstrap_trade_statistics(trades_df, n_resamples=1000, seed=0)
+    assert intervals["total_pnl"]["estimate"] == pytest.approx(trades_df["result"].sum())
+
+
+def test_seeded_results_are_reproducible_and_cached():
+    trades_df = _journal(200)
+    first = bootstrap_trade_statistics(trades_df, n_resamples=1000, seed=7)
+    assert bootstrap_trade_statistics(trades_df, n_resamples=1000, seed=7) == first
+
+    cached = bootstrap_trade_statistics(trades_df, n_resamples=1000, seed=7, version="v1")
+    # A cached version is returned without looking at the trades again
+    assert bootstrap_trade_statistics(trades_df.iloc[:0], n_resamples=1000, seed=7, version="v1") is cached
+
+
+def test_parallel_chunks_match_serial_distribution(monkeypatch):
+    trades_df = _journal(2000)
+    serial = bootstrap_trade_statistics(trades_df, n_resamples=2000, seed=3)
+
+    # Force small chunks through the shared thread pool
+    monkeypatch.setattr(bootstrap, "CHUNK_ELEMENTS", 200_000)
+    monkeypatch.setattr(bootstrap, "PARALLEL_THRESHOLD", 0)
+    parallel = bootstrap_trade_statistics(trades_df, n_resamples=2000, seed=3)
+
+    for metric in ("winrate", "total_pnl"):
+        width = serial[metric]["upper"] - serial[metric]["lower"]
+        assert parallel[metric]["lower"] == pytest.approx(serial[metric]["lower"], abs=0.1 * width)
+        assert parallel[metric]["upper"] == pytest.approx(serial[metric]["upper"], abs=0.1 * width)
+
+
+def test_resampled_indices_stay_within_budget(monkeypatch):
+    trades_df = _journal(2000)
+    full = bootstrap_trade_statistics(trades_df, n_resamples=1000, seed=5)
+
+    # 1000 resamples of 2000 trades would draw ten times the budget
+    monkeypatch.setattr(bootstrap, "RESAMPLE_BUDGET", 200_000)
+    sampled = []
+    resample_chunk = bootstrap._resample_chunk
+
+    def counting_chunk(trades, n_resamples, seed, sample_size=None):
+        sampled.append(n_resamples * min(sample_size or len(trades), len(trades)))
+        return resample_chunk(trades, n_resamples, seed, sample_size)
+
+    monkeypatch.setattr(bootstrap, "_resample_chunk", counting_chunk)
+    capped = bootstrap_trade_statistics(trades_df, n_resamples=20000, seed=5)
+    assert sum(sampled) <= bootstrap.RESAMPLE_BUDGET
+
+    # Smaller resamples are scaled back to the spread of full ones
+    for metric in ("winrate", "expectancy", "total_pnl"):
+        assert capped[metric]["estimate"] == full[metric]["estimate"]
+        width = full[metric]["upper"] - full[metric]["lower"]
+        assert capped[metric]["upper"] - capped[metric]["lower"] == pytest.approx(width, rel=0.15)
+        assert capped[metric]["lower"] < capped[metric]["estimate"] < capped[metric]["upper"]
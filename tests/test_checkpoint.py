@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from checkpoint import read_checkpoint, write_checkpoint
+from data_handler import JOURNAL_COLUMNS, TradeJournal
+from sync import NUMERIC_COLUMNS
+from utils import calculate_trade_statistics
+
+
+@pytest.fixture
+def journal_dir(tmp_path, make_trade):
+    journal = TradeJournal(str(tmp_path))
+    # Starting with an open trade leaves None in the result column
+    journal.add_trade(make_trade("Open", None))
+    journal.add_trade(make_trade("Win", 10))
+    journal.add_trade(make_trade("Loss", -5, pair="GBP/USD"))
+    journal.compact()
+    return tmp_path
+
+
+def test_checkpoint_round_trip_matches_csv(journal_dir):
+    journal = TradeJournal(str(journal_dir))
+    assert os.path.isdir(journal.checkpoint_dir)
+
+    from_csv = pd.read_csv(journal.journal_file, dtype={'trade_id': str})
+    from_checkpoint = journal.get_trades()
+
+    assert list(from_checkpoint.columns) == JOURNAL_COLUMNS
+    for column in NUMERIC_COLUMNS:
+        assert from_checkpoint[column].dtype == np.float64
+    pd.testing.assert_frame_equal(
+        from_checkpoint.reset_index(drop=True), from_csv,
+        check_dtype=False, check_column_type=False
+    )
+
+
+def test_statistics_after_reload_from_checkpoint(journal_dir):
+    stats = calculate_trade_statistics(TradeJournal(str(journal_dir)).get_trades())
+
+    assert stats["total_pnl"] == 5
+    assert stats["win_count"] == 1
+    assert stats["open_count"] == 1
+
+
+def test_numeric_columns_stored_as_floats(tmp_path):
+    source = tmp_path / "journal.csv"
+    source.write_text("result\n")
+    trades_df = pd.DataFrame({"result": [None, 10, "20"], "pair": ["EUR/USD", None, "USD/JPY"]}, dtype=object)
+
+    write_checkpoint(str(tmp_path / "ckpt"), trades_df, str(source), numeric_columns=["result"])
+    df, _, _ = read_checkpoint(str(tmp_path / "ckpt"), str(source))
+
+    assert df["result"].dtype == np.float64
+    np.testing.assert_array_equal(df["result"].to_numpy(), [np.nan, 10.0, 20.0])
+    assert df["pair"].isna().tolist() == [False, True, False]
+
+
+def test_stale_checkpoint_is_ignored(journal_dir):
+    journal = TradeJournal(str(journal_dir))
+    with open(journal.journal_file, "r+") as f:
+        f.seek(0)
+        f.write("x")
+
+    assert read_checkpoint(journal.checkpoint_dir, journal.journal_file) is None
+
+
+def test_concurrent_writers_leave_a_valid_checkpoint(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    source = tmp_path / "journal.csv"
+    trades_df = pd.DataFrame({"pair": ["EUR/USD"] * 1000, "result": np.arange(1000.0)})
+    trades_df.to_csv(source, index=False)
+    ckpt_dir = str(tmp_path / "ckpt")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: write_checkpoint(ckpt_dir, trades_df, str(source)), range(32)))
+
+    df, _, _ = read_checkpoint(ckpt_dir, str(source))
+    pd.testing.assert_frame_equal(df, trades_df, check_dtype=False)
+    # No staging directories are left behind
+    assert sorted(os.listdir(tmp_path)) == ["ckpt", "journal.csv"]
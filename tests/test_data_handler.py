@@ -0,0 +1,148 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_handler import TradeJournal
+from sync import row_hashes
+
+
+@pytest.fixture
+def journal(tmp_path, make_trade):
+    journal = TradeJournal(str(tmp_path))
+    for i in range(5):
+        journal.add_trade(make_trade(notes=f"trade {i}"))
+    return journal
+
+
+def test_updates_and_deletes_are_replayed_from_the_change_log(journal, reload_journal):
+    ids = journal.get_trades()["trade_id"].tolist()
+    csv_before = open(journal.journal_file).read()
+
+    assert journal.update_trade(ids[0], {"status": "Loss", "result": -5.0})
+    assert journal.update_trade(ids[0], {"notes": "second edit"})
+    assert journal.delete_trade(ids[1])
+    # Updates after a delete don't bring the trade back
+    assert not journal.update_trade(ids[1], {"notes": "ignored"})
+
+    # Edits only append to the change log
+    assert open(journal.journal_file).read() == csv_before
+
+    reloaded = reload_journal(journal).get_trades().set_index("trade_id")
+    assert ids[1] not in reloaded.index
+    assert reloaded.loc[ids[0], "status"] == "Loss"
+    assert reloaded.loc[ids[0], "result"] == -5.0
+    assert reloaded.loc[ids[0], "notes"] == "second edit"
+    pd.testing.assert_frame_equal(reloaded, journal.get_trades().set_index("trade_id"),
+                                  check_dtype=False, check_index_type=False)
+
+
+def test_compact_folds_changes_into_the_csv(journal):
+    ids = journal.get_trades()["trade_id"].tolist()
+    journal.delete_trade(ids[2])
+    journal.update_trade(ids[3], {"notes": "edited"})
+
+    assert journal.compact()
+    assert not os.path.exists(journal.changes_file)
+
+    csv = pd.read_csv(journal.journal_file, dtype={"trade_id": str}).set_index("trade_id")
+    assert ids[2] not in csv.index
+    assert csv.loc[ids[3], "notes"] == "edited"
+
+
+def test_readding_a_deleted_trade_restores_it(journal, reload_journal):
+    trades = journal.get_trades()
+    trade = trades.iloc[[4]].copy()
+    trade_id = trade["trade_id"].iloc[0]
+
+    journal.delete_trade(trade_id)
+    trade["notes"] = "restored"
+    assert journal.add_trades(trade)
+
+    for current in (journal, reload_journal(journal)):
+        reloaded = current.get_trades()
+        assert (reloaded["trade_id"] == trade_id).sum() == 1
+        assert reloaded.set_index("trade_id").loc[trade_id, "notes"] == "restored"
+
+
+def test_truncated_change_record_is_ignored(journal, reload_journal):
+    trade_id = journal.get_trades()["trade_id"].iloc[0]
+    journal.update_trade(trade_id, {"notes": "kept"})
+    with open(journal.changes_file, "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "trade_')
+
+    reloaded = reload_journal(journal).get_trades().set_index("trade_id")
+    assert reloaded.loc[trade_id, "notes"] == "kept"
+    assert len(reloaded) == 5
+
+
+def test_incremental_row_hashes_match_a_full_rehash(journal, make_trade):
+    ids = journal.get_trades()["trade_id"].tolist()
+    journal.get_row_hashes()
+    journal.update_trade(ids[0], {"result": 99.0})
+    journal.delete_trade(ids[1])
+    journal.add_trade(make_trade(status="Open", result=None))
+
+    expected = row_hashes(journal.get_trades())
+    actual = journal.get_row_hashes()
+    assert sorted(map(tuple, actual.tolist())) == sorted(map(tuple, expected.tolist()))
+
+
+def test_iter_trades_matches_get_trades(journal):
+    ids = journal.get_trades()["trade_id"].tolist()
+    journal.delete_trade(ids[0])
+    journal.update_trade(ids[4], {"result": -1.0})
+
+    chunks = pd.concat(journal.iter_trades(chunksize=2), ignore_index=True)
+    pd.testing.assert_frame_equal(chunks, journal.get_trades(), check_dtype=False)
+
+
+def test_add_trade_restores_a_tombstoned_trade(journal, reload_journal):
+    trade = journal.get_trades().iloc[4].to_dict()
+    journal.delete_trade(trade["trade_id"])
+    assert journal.add_trade(dict(trade, notes="back"))
+
+    for current in (journal, reload_journal(journal)):
+        trades = current.get_trades()
+        assert len(trades) == 5
+        assert trades.set_index("trade_id").loc[trade["trade_id"], "notes"] == "back"
+
+
+def test_dates_are_normalized_and_invalid_dates_rejected(journal, make_trade, reload_journal):
+    trade_id = journal.get_trades()["trade_id"].iloc[0]
+
+    assert journal.update_trade(trade_id, {"date": "2024-01-02"})
+    assert not journal.update_trade(trade_id, {"date": "2024-13-45"})
+    assert not journal.add_trade(make_trade(notes="typo") | {"date": "yesterday-ish"})
+    assert journal.add_trade(make_trade(notes="entered") | {"date": "2024-01-03 9:05"})
+
+    trades = reload_journal(journal).get_trades().set_index("trade_id")
+    assert trades.loc[trade_id, "date"] == "2024-01-02 00:00"
+    assert trades["date"].iloc[-1] == "2024-01-03 09:05"
+    assert "typo" not in trades["notes"].tolist()
+
+
+def test_compact_keeps_changes_made_by_another_session(journal, make_trade, reload_journal):
+    ids = journal.get_trades()["trade_id"].tolist()
+    other = reload_journal(journal)
+    assert journal.delete_trade(ids[0])
+    assert other.update_trade(ids[1], {"notes": "from other session"})
+    assert other.add_trade(make_trade(notes="added by other session"))
+
+    # The first session never saw the other session's edits
+    assert journal.compact()
+    assert not os.path.exists(journal.changes_file)
+    assert not [f for f in os.listdir(journal.data_path) if f.endswith((".tmp", ".compacting"))]
+
+    # Edits after compaction start a new change log
+    assert other.update_trade(ids[2], {"status": "Loss"})
+
+    reloaded = reload_journal(journal).get_trades().set_index("trade_id")
+    assert ids[0] not in reloaded.index
+    assert reloaded.loc[ids[1], "notes"] == "from other session"
+    assert reloaded.loc[ids[2], "status"] == "Loss"
+    assert "added by other session" in reloaded["notes"].tolist()
+    assert len(reloaded) == 5
+    # The compacting session now holds what it wrote
+    pd.testing.assert_frame_equal(journal.get_trades().set_index("trade_id").drop(ids[2]),
+                                  reloaded.drop(ids[2]), check_dtype=False, check_index_type=False)
@@ -0,0 +1,110 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_handler import TradeJournal
+from export import export_journal, export_report, iter_report
+
+
+def _trades(n, notes=""):
+    win = np.arange(n) % 3 != 0
+    return pd.DataFrame({
+        "trade_id": [f"{i:016x}" for i in range(n)],
+        "date": pd.date_range("2024-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M"),
+        "pair": np.where(np.arange(n) % 2 == 0, "EUR/USD", "USD/JPY"),
+        "entry_price": 1.1,
+        "stop_loss": 1.095,
+        "take_profit": 1.11,
+        "position_size": 0.1,
+        "result": np.where(win, 10.0, -5.0),
+        "status": np.where(win, "Win", "Loss"),
+        "rr": 2.0,
+        "notes": notes
+    })
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TradeJournal(str(tmp_path))
+    trades = _trades(30)
+    # Only the last chunk has notes, so earlier chunks hold nothing but missing values
+    trades.loc[25:, "notes"] = "late entry"
+    journal.add_trades(trades)
+    return journal
+
+
+def test_csv_export_matches_journal(journal, tmp_path):
+    path = tmp_path / "export.csv"
+    rows = export_journal(journal, "csv", str(path), chunksize=7)
+
+    exported = pd.read_csv(path, dtype={"trade_id": str})
+    assert rows == len(exported) == 30
+    assert exported["trade_id"].tolist() == journal.get_trades()["trade_id"].tolist()
+    assert exported["result"].sum() == journal.get_trades()["result"].sum()
+
+
+def test_jsonl_export_writes_one_record_per_line(journal):
+    output = io.BytesIO()
+    rows = export_journal(journal, "jsonl", output, filters={"pairs": ["EUR/USD"]}, chunksize=7)
+
+    records = [json.loads(line) for line in output.getvalue().decode("utf-8").splitlines()]
+    assert rows == len(records) == 15
+    assert {record["pair"] for record in records} == {"EUR/USD"}
+
+
+def test_parquet_export_keeps_one_schema_across_chunks(journal, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = tmp_path / "export.parquet"
+    rows = export_journal(journal, "parquet", str(path), chunksize=7)
+
+    table = pq.read_table(path)
+    assert rows == table.num_rows == 30
+    assert str(table.schema.field("notes").type) == "string"
+    assert str(table.schema.field("result").type) == "double"
+    assert table.column("notes").to_pylist()[-1] == "late entry"
+
+
+def test_parquet_export_stringifies_numbers_in_text_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    chunks = [
+        pd.DataFrame({"notes": pd.Series([None, None], dtype=object), "result": [1.0, 2.0]}),
+        pd.DataFrame({"notes": pd.Series([1.5, "text"], dtype=object), "result": [3.0, 4.0]})
+    ]
+    path = tmp_path / "export.parquet"
+    export_report(iter(chunks), "parquet", str(path))
+
+    assert pq.read_table(path).column("notes").to_pylist() == [None, None, "1.5", "text"]
+
+
+def test_xlsx_export_streams_all_rows(journal, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+
+    path = tmp_path / "export.xlsx"
+    rows = export_journal(journal, "xlsx", str(path), report="pair_breakdown", chunksize=7)
+
+    sheet = openpyxl.load_workbook(path).active
+    values = list(sheet.values)
+    assert rows == 2
+    assert values[0][0] == "pair"
+    assert sorted(row[0] for row in values[1:]) == ["EUR/USD", "USD/JPY"]
+
+
+def test_aggregate_reports_match_whole_journal(journal):
+    stats = next(iter_report(journal.iter_trades(7), "stats"))
+    assert stats["trades"].item() == 30
+    assert stats["win_count"].item() == 20
+    assert stats["total_pnl"].item() == pytest.approx(20 * 10 - 10 * 5)
+
+    curve = pd.concat(iter_report(journal.iter_trades(7), "equity_curve"))
+    assert curve["equity"].iloc[-1] == pytest.approx(150)
+    assert curve["equity"].is_monotonic_increasing is False
+
+
+def test_unknown_format_raises(journal):
+    with pytest.raises(ValueError):
+        export_journal(journal, "xml", io.BytesIO())
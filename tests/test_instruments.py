@@ -0,0 +1,74 @@
+import pytest
+
+from instruments import (DEFAULT_PIP_SIZE, DEFAULT_PIP_VALUE, CrossRateTable, get_instrument,
+                         is_known_instrument, normalize_pair, pip_size)
+import pandas as pd
+
+from utils import calculate_position_size, calculate_position_sizes
+
+
+def test_normalize_pair_accepts_common_spellings():
+    assert normalize_pair("eur/usd") == normalize_pair("EUR_USD") == normalize_pair("EURUSD") == "EURUSD"
+
+
+def test_registry_and_heuristic_pip_sizes():
+    assert pip_size("EUR/USD") == 0.0001
+    assert pip_size("USD/JPY") == 0.01
+    assert pip_size("XAU/USD") == 0.1
+    assert pip_size("DE40") == pip_size("GER30") == 1.0
+    # Six-letter names are treated as currency pairs
+    assert pip_size("SEK/JPY") == 0.01
+    # Other unregistered instruments fall back to one price unit instead of raising
+    assert not is_known_instrument("USOIL")
+    assert pip_size("USOIL") == DEFAULT_PIP_SIZE == 1.0
+    with pytest.raises(ValueError):
+        get_instrument("USOIL")
+
+
+def test_pip_value_converts_through_quotes(tmp_path):
+    quotes = tmp_path / "quotes.csv"
+    quotes.write_text("pair,price\nEURUSD,1.10\nUSDJPY,150\n")
+    table = CrossRateTable(str(quotes))
+
+    assert table.pip_value("EUR/USD", "USD") == pytest.approx(10)
+    assert table.pip_value("EUR/USD", "EUR") == pytest.approx(10 / 1.10)
+    # JPY quote to EUR goes through USD
+    assert table.pip_value("GBP/JPY", "EUR") == pytest.approx(1000 / 150 / 1.10)
+
+
+def test_pip_value_without_rate_raises():
+    with pytest.raises(ValueError):
+        CrossRateTable(None).pip_value("GBP/JPY", "EUR")
+
+
+def test_position_size_for_unknown_instrument_uses_defaults():
+    # A 10-point stop risking 100 at 10 per point is one lot, as before the registry
+    result = calculate_position_size(10000, 1, 80.0, 70.0, pair="USOIL", account_currency="EUR")
+
+    assert result["pip_value"] == DEFAULT_PIP_VALUE
+    assert result["pips_at_risk"] == pytest.approx(10)
+    assert result["position_size"] == pytest.approx(1)
+
+
+def test_batch_sizes_match_single_sizes_with_one_lookup_per_instrument(tmp_path):
+    quotes = tmp_path / "quotes.csv"
+    quotes.write_text("pair,price\nEURUSD,1.10\nUSDJPY,150\n")
+    table = CrossRateTable(str(quotes))
+    trades_df = pd.DataFrame({
+        "pair": ["EUR/USD", "USD/JPY", "EUR/USD", "USOIL", "GBP/CHF"],
+        "entry_price": [1.1, 150.0, 1.2, 80.0, 1.1],
+        "stop_loss": [1.095, 149.5, 1.19, 79.0, 1.09],
+    })
+
+    lookups = []
+    pip_value = table.pip_value
+    table.pip_value = lambda *args, **kwargs: lookups.append(args[0]) or pip_value(*args, **kwargs)
+    sizes = calculate_position_sizes(trades_df, 10000, 1, "USD", table)
+
+    assert sorted(lookups) == ["EUR/USD", "GBP/CHF", "USD/JPY"]
+    # No CHF rate: that row can't be sized
+    assert sizes["position_size"].isna().tolist() == [False, False, False, False, True]
+    for i in range(4):
+        single = calculate_position_size(10000, 1, trades_df.loc[i, "entry_price"], trades_df.loc[i, "stop_loss"],
+                                         pair=trades_df.loc[i, "pair"], rate_table=table)
+        assert sizes.loc[i, "position_size"] == pytest.approx(single["position_size"])
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from management import (_manage, calibrate_drift, random_walk_source, simulate_management,
+                        summarize_management)
+from utils import calculate_distribution_expected_value, calculate_expected_value
+
+
+def _path(*closes):
+    """One path whose bars open at the previous close and never range beyond it."""
+    close = np.array([closes], dtype=float)
+    open_ = np.concatenate([[[0.0]], close[:, :-1]], axis=1)
+    return open_, np.maximum(open_, close), np.minimum(open_, close), close
+
+
+def test_fixed_rule_exits_at_stop_or_target():
+    r, reason = _manage(*_path(0.5, 1.5, 2.5), {"target_r": 2.0})
+    assert r[0] == pytest.approx(2.0) and reason[0] == 3
+
+    r, reason = _manage(*_path(-0.5, -1.2), {"target_r": 2.0})
+    assert r[0] == pytest.approx(-1.0) and reason[0] == 0
+
+    r, reason = _manage(*_path(0.5, 0.7), {"target_r": 2.0})
+    assert r[0] == pytest.approx(0.7) and reason[0] == 4
+
+
+def test_gap_through_the_stop_fills_at_the_open():
+    open_, high, low, close = _path(0.5, -1.5)
+    open_[0, 1] = -1.5
+    high[0, 1] = -1.5
+    r, _ = _manage(open_, high, low, close, {"target_r": 2.0})
+    assert r[0] == pytest.approx(-1.5)
+
+
+def test_breakeven_trailing_and_partial_close():
+    path = _path(1.2, 0.5, -0.2)
+    r, reason = _manage(*path, {"target_r": 3.0, "breakeven_r": 1.0})
+    assert r[0] == pytest.approx(0.0) and reason[0] == 1
+
+    r, reason = _manage(*path, {"target_r": 3.0, "trail_r": 0.5})
+    assert r[0] == pytest.approx(0.7) and reason[0] == 2
+
+    r, _ = _manage(*_path(1.2, 0.0, -1.5), {"target_r": 3.0, "partial_r": 1.0, "partial_pct": 50})
+    assert r[0] == pytest.approx(0.5 * 1.0 + 0.5 * -1.0)
+
+
+def test_fixed_rule_reproduces_binary_expected_value():
+    winrate, target_r = 40.0, 2.0
+    drift = calibrate_drift(winrate, target_r, 0.1)
+    results = simulate_management(random_walk_source(drift, 0.1), [{"name": "Fixed", "target_r": target_r}],
+                                  n_paths=10000, n_bars=2000, seed=0)
+
+    summary = summarize_management(results).set_index("rule")
+    assert summary.loc["Fixed", "winrate"] == pytest.approx(winrate, abs=2)
+    assert summary.loc["Fixed", "time_pct"] < 1
+
+    binary = calculate_expected_value(target_r, winrate, 1.0)["expected_value_per_trade"]
+    simulated = calculate_distribution_expected_value(results["r_multiple"], 1.0, seed=0)
+    assert simulated["expected_value_per_trade"] == pytest.approx(binary, abs=0.08)
+    low, high = simulated["projection_ranges"][100]
+    assert low < simulated["projections"][100] < high
+
+
+def test_rules_share_paths_and_seed_is_reproducible():
+    rules = [{"name": "Fixed", "target_r": 2.0}, {"name": "Breakeven", "target_r": 2.0, "breakeven_r": 1.0}]
+    first = simulate_management(random_walk_source(), rules, n_paths=500, n_bars=200, seed=3)
+    second = simulate_management(random_walk_source(), rules, n_paths=500, n_bars=200, seed=3)
+
+    assert first.equals(second)
+    assert len(first) == 1000
+    fixed = first[first["rule"] == "Fixed"]["r_multiple"].to_numpy()
+    moved = first[first["rule"] == "Breakeven"]["r_multiple"].to_numpy()
+    # On the same paths, full targets hit without touching 1R first are impossible
+    assert np.all(moved[fixed == 2.0] >= 0)
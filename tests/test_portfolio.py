@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import OHLC_DTYPE
+from portfolio import build_positions, cap_new_position, cap_position_size, portfolio_risk
+
+
+def _positions(rows):
+    return build_positions(pd.DataFrame(rows, columns=["pair", "entry_price", "stop_loss", "position_size"]))
+
+
+def _write_bars(ohlc_dir, pair, closes):
+    bars = np.zeros(len(closes), dtype=OHLC_DTYPE)
+    bars['time'] = pd.date_range("2024-01-01", periods=len(closes), freq="h").to_numpy()
+    for field in ("open", "high", "low", "close"):
+        bars[field] = closes
+    np.save(ohlc_dir / f"{pair}.npy", bars)
+
+
+def test_positions_carry_direction_and_stop_risk():
+    positions = _positions([
+        ("EUR/USD", 1.1000, 1.0950, 1.0),
+        ("USD/CHF", 0.9000, 0.9050, 0.5),
+        ("USOIL", 80.0, 79.0, 1.0),
+    ])
+
+    # Unregistered instruments are left out
+    assert positions['symbol'].tolist() == ["EURUSD", "USDCHF"]
+    assert positions['direction'].tolist() == [1.0, -1.0]
+    assert positions['stop_risk'].iloc[0] == pytest.approx(500)
+
+
+def test_without_history_stop_losses_add_up():
+    positions = _positions([("EUR/USD", 1.1000, 1.0950, 1.0), ("GBP/USD", 1.3000, 1.2950, 1.0)])
+    risk = portfolio_risk(positions, 10000)
+
+    assert risk['total_risk'] == pytest.approx(1000)
+    assert risk['correlated_risk'] == pytest.approx(1000)
+    assert risk['total_risk_pct'] == pytest.approx(10)
+
+
+def test_positions_without_history_count_in_var_at_their_stops(tmp_path):
+    positions = _positions([("EUR/USD", 1.1000, 1.0950, 1.0)])
+
+    # An OHLC directory without the pair must not report zero risk
+    risk = portfolio_risk(positions, 10000, str(tmp_path))
+    assert risk['missing_history'] == ["EURUSD"]
+    assert risk['var'] == pytest.approx(500)
+
+    rng = np.random.default_rng(0)
+    _write_bars(tmp_path, "EURUSD", 1.1 * np.exp(np.cumsum(rng.normal(0, 0.001, 600))))
+    risk = portfolio_risk(positions, 10000, str(tmp_path))
+    assert risk['missing_history'] == []
+    # One standard deviation of a 110,000 USD position is about 110 USD
+    assert 100 < risk['var'] < 260
+
+
+def test_hedged_positions_offset_with_known_correlation(tmp_path):
+    rng = np.random.default_rng(1)
+    closes = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.001, 600)))
+    _write_bars(tmp_path, "EURUSD", closes)
+    _write_bars(tmp_path, "GBPUSD", closes * 1.2)
+
+    positions = _positions([("EUR/USD", 1.1000, 1.0950, 1.0), ("GBP/USD", 1.3000, 1.3050, 1.0)])
+    risk = portfolio_risk(positions, 10000, str(tmp_path))
+
+    assert risk['total_risk'] == pytest.approx(1000)
+    # Perfectly correlated pairs held in opposite directions hedge each other
+    assert risk['correlated_risk'] == pytest.approx(0, abs=1e-6)
+
+
+def test_cap_position_size_fills_remaining_budget():
+    positions = _positions([("EUR/USD", 1.1000, 1.0950, 1.0)])
+    new_position = _positions([("GBP/USD", 1.3000, 1.2950, 1.0)])
+
+    # 500 at risk already; a 2% budget of 100,000 leaves 1,500, i.e. 3 lots at 500 each
+    assert cap_position_size(new_position, positions, 100000, 2.0) == pytest.approx(3)
+    assert cap_position_size(new_position, positions, 10000, 2.0) == 0.0
+
+
+def test_hedge_against_open_positions_is_not_capped(tmp_path):
+    rng = np.random.default_rng(2)
+    closes = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.001, 600)))
+    _write_bars(tmp_path, "EURUSD", closes)
+    _write_bars(tmp_path, "GBPUSD", closes * 1.2)
+
+    # As the position sizer does: risk of the open positions, then the cap for the new one
+    open_positions = _positions([("EUR/USD", 1.1000, 1.0950, 1.0)])
+    portfolio_risk(open_positions, 10000, str(tmp_path))
+    new_position = _positions([("GBP/USD", 1.3000, 1.3050, 1.0)])
+    max_size = cap_new_position(new_position, open_positions, 10000, 5.0, str(tmp_path))
+
+    # A short on a perfectly correlated pair offsets the open long: |500 - 500 * lots| <= 500 up to 2 lots
+    assert max_size == pytest.approx(2.0)
+    # Without history the positions are assumed to add up
+    assert cap_new_position(new_position, open_positions, 10000, 5.0) == 0.0
@@ -0,0 +1,41 @@
+import pytest
+
+from data_handler import TradeJournal
+from price_stream import OpenTradeTracker, Tick
+
+
+@pytest.fixture
+def journal(tmp_path, make_trade):
+    journal = TradeJournal(str(tmp_path))
+    journal.add_trade(make_trade("Open", None, pair="EUR/USD", position_size=1.0,
+                                 entry_price=1.1000, stop_loss=1.0950, take_profit=1.1100))
+    # Not in the instrument registry
+    journal.add_trade(make_trade("Open", None, pair="USOIL", position_size=1.0,
+                                 entry_price=80.0, stop_loss=79.0, take_profit=82.0))
+    return journal
+
+
+def test_ticks_track_and_close_trades(journal):
+    tracker = OpenTradeTracker(journal)
+    eur_id, oil_id = journal.get_trades()["trade_id"]
+
+    ticks = [
+        Tick(0, "EURUSD", 1.1020),
+        Tick(1, "USOIL", 80.5),
+        Tick(2, "EUR/USD", 1.0940),
+        Tick(3, "USOIL", 82.5),
+    ]
+    assert tracker.run(ticks[:2]) == []
+    assert tracker.get_unrealized()[eur_id] == pytest.approx(20)
+
+    # A tick for an unregistered instrument doesn't stop the stream
+    closed = tracker.run(ticks[2:])
+    assert closed == [eur_id, oil_id]
+
+    trades = journal.get_trades().set_index("trade_id")
+    assert trades.loc[eur_id, "status"] == "Loss"
+    assert trades.loc[eur_id, "result"] == pytest.approx(-50)
+    assert trades.loc[oil_id, "status"] == "Win"
+    # Unregistered instruments count one price unit per pip
+    assert trades.loc[oil_id, "result"] == pytest.approx(2)
+    assert journal.get_open_trades().empty
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import RollingMetrics, closed_trade_values, rolling_metrics_history
+
+
+def _journal(statuses, rr=2.0):
+    return pd.DataFrame({
+        "status": statuses,
+        "rr": rr,
+        "result": [20.0 if s == "Win" else -10.0 if s == "Loss" else np.nan for s in statuses]
+    })
+
+
+def test_windows_match_last_n_closed_trades():
+    statuses = ["Win", "Loss", "Open", "Loss", "Win", "Win", "Loss"]
+    rolling = RollingMetrics(windows=(3, 10))
+    for trade in _journal(statuses).to_dict("records"):
+        rolling.push(trade)
+
+    last3 = rolling.snapshot()[3]
+    # Last three closed trades: Win, Win, Loss
+    assert last3["count"] == 3
+    assert last3["winrate"] == pytest.approx(200 / 3)
+    assert last3["avg_pnl"] == pytest.approx(10)
+    assert last3["avg_r"] == pytest.approx(1)
+    assert rolling.snapshot()[10]["count"] == 6
+
+
+def test_rebuild_matches_incremental_and_history():
+    trades_df = _journal(["Win", "Loss"] * 30 + ["Loss"] * 10)
+    incremental = RollingMetrics()
+    for trade in trades_df.to_dict("records"):
+        incremental.push(trade)
+
+    rebuilt = RollingMetrics()
+    rebuilt.rebuild(trades_df)
+    restored = RollingMetrics()
+    restored.restore(closed_trade_values(trades_df)[-100:])
+    history = rolling_metrics_history(trades_df).iloc[-1]
+
+    for size in (20, 50, 100):
+        expected = incremental.snapshot()[size]
+        assert rebuilt.snapshot()[size] == pytest.approx(expected)
+        assert restored.snapshot()[size] == pytest.approx(expected)
+        for metric in ("winrate", "avg_pnl", "avg_r"):
+            assert history[f"{metric}_{size}"] == pytest.approx(expected[metric])
+
+
+def test_alerts_fire_once_when_a_full_window_crosses():
+    rolling = RollingMetrics(windows=(4,), thresholds={"winrate": 50.0})
+    alerts = []
+    for status in ["Win"] * 4 + ["Loss"] * 4:
+        alerts += rolling.push({"status": status, "rr": 2.0, "result": 0.0})
+
+    assert len(alerts) == 1
+    assert alerts[0]["direction"] == "below"
+    assert alerts[0]["value"] == pytest.approx(25)
+    assert rolling.pop_alerts() == alerts
+    assert rolling.pop_alerts() == []
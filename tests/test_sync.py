@@ -0,0 +1,111 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_handler import TradeJournal
+from sync import diff_chunks, merkle_summary, row_hashes, sync_journals
+
+
+def _trades(n, seed=0):
+    rng = np.random.default_rng(seed)
+    win = rng.random(n) < 0.5
+    return pd.DataFrame({
+        "pair": rng.choice(["EUR/USD", "GBP/USD"], n),
+        "entry_price": 1.1,
+        "stop_loss": 1.095,
+        "take_profit": 1.11,
+        "position_size": 0.1,
+        "result": np.where(win, 10.0, -5.0),
+        "status": np.where(win, "Win", "Loss"),
+        "rr": 2.0,
+        "notes": ""
+    })
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    local = TradeJournal(str(tmp_path / "local"))
+    # Trades without trade_id and date columns get both filled in
+    assert local.add_trades(_trades(200))
+    local.compact()
+    shutil.copytree(tmp_path / "local", tmp_path / "remote")
+    remote = TradeJournal(str(tmp_path / "remote"))
+    # The first sync records the common base
+    assert sync_journals(local, remote)["in_sync"]
+    return local, remote
+
+
+def test_add_trades_fills_missing_ids_and_dates(tmp_path, reload_journal):
+    journal = TradeJournal(str(tmp_path))
+    assert journal.add_trades(_trades(3))
+
+    trades = reload_journal(journal).get_trades()
+    assert trades["trade_id"].notna().all() and trades["trade_id"].is_unique
+    assert trades["date"].notna().all()
+    assert trades["result"].dtype == np.float64
+
+
+def test_merkle_diff_finds_only_changed_chunks():
+    trades = _trades(1000)
+    trades.insert(0, "trade_id", [f"{i:016x}" for i in range(len(trades))])
+    hashes = row_hashes(trades)
+
+    # The summary doesn't depend on row order
+    shuffled = row_hashes(trades.sample(frac=1, random_state=0))
+    assert merkle_summary(hashes)[0][0] == merkle_summary(shuffled)[0][0]
+    assert len(diff_chunks(merkle_summary(hashes), merkle_summary(shuffled))[0]) == 0
+
+    edited = trades.copy()
+    edited.loc[10, "notes"] = "edited"
+    chunks, compared = diff_chunks(merkle_summary(hashes), merkle_summary(row_hashes(edited)))
+    assert len(chunks) == 1
+    assert compared < len(merkle_summary(hashes)[-1])
+
+
+def test_three_way_merge_propagates_one_sided_changes(replicas, reload_journal):
+    local, remote = replicas
+    ids = local.get_trades()["trade_id"].tolist()
+
+    local.add_trades(_trades(2, seed=1))
+    local.update_trade(ids[0], {"notes": "local edit"})
+    remote.delete_trade(ids[1])
+    remote.update_trade(ids[2], {"status": "Loss", "result": -5.0})
+
+    report = sync_journals(local, remote)
+    assert report["in_sync"]
+    assert (report["added_remote"], report["updated_remote"]) == (2, 1)
+    assert (report["updated_local"], report["deleted_local"]) == (1, 1)
+    assert report["conflicts"].empty
+
+    local, remote = reload_journal(local), reload_journal(remote)
+    for journal in (local, remote):
+        trades = journal.get_trades().set_index("trade_id")
+        assert len(trades) == 201
+        assert ids[1] not in trades.index
+        assert trades.loc[ids[0], "notes"] == "local edit"
+        assert trades.loc[ids[2], "result"] == -5.0
+    assert sync_journals(local, remote)["chunks"] == 0
+
+
+def test_conflicting_edits_are_resolved_the_same_way_on_both_sides(replicas):
+    local, remote = replicas
+    trade_id = local.get_trades()["trade_id"].iloc[0]
+
+    local.update_trade(trade_id, {"notes": "local"})
+    remote.update_trade(trade_id, {"notes": "remote"})
+    other = local.get_trades()["trade_id"].iloc[1]
+    local.update_trade(other, {"notes": "kept"})
+    remote.delete_trade(other)
+
+    report = sync_journals(local, remote)
+    assert report["in_sync"]
+    conflicts = report["conflicts"].set_index("trade_id")
+    assert conflicts.loc[trade_id, "kind"] == "edit/edit"
+    assert conflicts.loc[other, "kind"] == "edit/delete"
+
+    notes = {j.get_trades().set_index("trade_id").loc[trade_id, "notes"] for j in (local, remote)}
+    assert len(notes) == 1
+    # An edit wins over a delete
+    assert remote.get_trades().set_index("trade_id").loc[other, "notes"] == "kept"